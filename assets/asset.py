@@ -1,17 +1,31 @@
-import time
 import logging
+import numpy as np
 import pandas as pd
 
 
-from kraken.spot import Market
 from kraken.exceptions import *  # pylint: disable=wildcard-import,unused-wildcard-import
+from assets import indicators
+from utils.candle_store import KRAKEN_MAX_CANDLES, get_candle_store
 from utils.data_converter import ohlc_to_dataframe
+from utils import market_data
+from utils.metrics import measure
 
 
 class AssetException(Exception):
     """Custom exception for market data errors."""
 
 
+def get_asset_prices(assets: list["Asset"]) -> dict[str, float]:
+    """Fetches the current prices of several assets with a single ticker request and returns them by pair."""
+    try:
+        tickers = market_data.get_tickers([asset.pair for asset in assets])
+
+    except (KrakenUnknownAssetError, KrakenUnknownAssetPairError) as e:
+        raise AssetException(str(e).replace("\n", " ")) from e
+
+    return {pair: float(ticker["c"][0]) for pair, ticker in tickers.items()}
+
+
 class Asset:
 
     pair = None
@@ -19,6 +33,9 @@ class Asset:
     df_1w = None
     ath = None
 
+    # Market snapshot of the current run, when set prices and candles are read from it instead of the market data
+    snapshot = None
+
     intervals_to_min = {"1m": 1, "5m": 5, "15m": 15, "30m": 30, "1h": 60, "4h": 240, "1d": 1440, "1w": 10080, "2w": 21600}
 
     def __init__(self, pair: str):
@@ -41,42 +58,59 @@ class Asset:
     def get_ath(self) -> float:
         """Returns the All Time High (ATH) of the asset."""
         if self.ath is None:
-            self.ath = self.get_df_1w()["high"].astype(float).max()
+            self.ath = self.get_df_1w()["high"].max()
 
         return self.ath
 
+    @measure("asset.get_ohlc")
     def get_ohlc(self, pair: str, interval: str, length: int = 720):
-        """Fetches OHLC (Open, High, Low, Close) data for a given currency pair
-        and interval from the Kraken API.
-        Returns at max 720 time steps per request.
-        This is the defined maximum length for the Kraken API.
+        """Returns OHLC (Open, High, Low, Close) data for a given currency pair and interval as DataFrame,
+        from the market snapshot if one is set or else from the local candle store.
         """
+        if self.snapshot is not None:
+            return ohlc_to_dataframe(self.snapshot.candles(pair, interval)[-length:])
 
-        # Convert length to seconds
-        since = time.time() - self.intervals_to_min[interval] * 60 * length
+        return ohlc_to_dataframe(self.load_candles(pair, interval, length))
 
-        try:
-            ohlc = Market().get_ohlc(pair, self.intervals_to_min[interval], since)
+    def load_candles(self, pair: str, interval: str, length: int = 720) -> list:
+        """Loads OHLC data for a given currency pair and interval from the local candle store as Kraken OHLC rows.
+        The store is topped up with the candles since the newest stored candle from the Kraken API,
+        which returns at max 720 time steps per request. Longer lengths are served from the stored history.
+        """
+        minutes = self.intervals_to_min[interval]
+        store = get_candle_store()
 
-        except (KrakenUnknownAssetError, KrakenUnknownAssetPairError, KrakenInvalidArgumentsError) as e:
-            raise AssetException(str(e).replace("\n", " ")) from e
+        def fetch(since: float) -> list:
+            """Fetches the candles since the timestamp from Kraken."""
+            try:
+                ohlc = market_data.get_ohlc(pair, minutes, since)
 
-        data = []
-        for v in ohlc.values():
-            data = v
-            break
+            except (KrakenUnknownAssetError, KrakenUnknownAssetPairError, KrakenInvalidArgumentsError) as e:
+                raise AssetException(str(e).replace("\n", " ")) from e
+
+            for v in ohlc.values():
+                return v
+
+            return []
+
+        store.update(pair, minutes, length, fetch)
+        data = store.get(pair, minutes, length)
 
         # Check if the data length matches the expected length if the interval is less than a week
         # for BTC and younger assets there are no 720 weekly candlesticks available on 2025-06-25
-        if len(data) != length and self.intervals_to_min[interval] < 10080:
+        if len(data) < min(length, KRAKEN_MAX_CANDLES) and minutes < 10080:
             raise AssetException(f"Received {len(data)} data points for {pair} with interval {interval}, expected {length}.")
 
-        return ohlc_to_dataframe(data)
+        return data
 
+    @measure("asset.get_asset_price")
     def get_asset_price(self) -> float:
-        """Fetches the current value for a given currency pair."""
+        """Fetches the current value for a given currency pair, the price of the market snapshot if one is set."""
+        if self.snapshot is not None:
+            return self.snapshot.price(self.pair)
+
         try:
-            ticker = Market().get_ticker(self.pair)
+            ticker = market_data.get_ticker(self.pair)
 
             for v in ticker.values():
                 return float(v["c"][0])
@@ -84,18 +118,14 @@ class Asset:
         except (KrakenUnknownAssetError, KrakenUnknownAssetPairError) as e:
             raise AssetException(str(e).replace("\n", " ")) from e
 
+    def get_indicator(self, name: str, interval: str = "1d", **params) -> np.ndarray:
+        """Returns an indicator of the indicator registry over the close prices of the 1d or 1w candles."""
+        df = self.get_df_1w() if interval == "1w" else self.get_df_1d()
+        return indicators.compute(self.pair, interval, name, df["time"].to_numpy(), df["close"].to_numpy(dtype=np.float64), **params)
+
     def calculate_rsi(self, window: int = 14) -> pd.DataFrame:
         df = self.get_df_1d()
-        df["change"] = df["close"].astype(float).diff()
-        df["gain"] = df.change.mask(df.change < 0, 0.0)
-        df["loss"] = -df.change.mask(df.change > 0, -0.0)
-
-        # Calculate average gain and loss
-        df["avg_gain"] = df["gain"].rolling(window=window, min_periods=window).mean()
-        df["avg_loss"] = df["loss"].rolling(window=window, min_periods=window).mean()
-
-        df["rs"] = df.avg_gain / df.avg_loss
-        df["rsi"] = 100 - (100 / (1 + df.rs))
+        df["rsi"] = self.get_indicator("rsi", "1d", window=window)
 
         return df
 
@@ -106,8 +136,8 @@ class Asset:
 
         column_name = "sma_" + str(window)
 
-        df_1d[column_name] = df_1d["close"].astype(float).rolling(window=window, min_periods=window).mean()
-        df_1w[column_name] = df_1w["close"].astype(float).rolling(window=window, min_periods=window).mean()
+        df_1d[column_name] = self.get_indicator("sma", "1d", window=window)
+        df_1w[column_name] = self.get_indicator("sma", "1w", window=window)
 
         return df_1d
 
@@ -138,18 +168,19 @@ class Asset:
             self.calculate_sma(window)
 
         sma = self.get_df_1w()[column_name].iloc[-1]
+        price = self.get_asset_price()
 
-        if self.get_asset_price() < sma:
-            logging.info(f"{self.pair} Price {self.get_asset_price()} is below Weekly SMA {sma}")
+        if price < sma:
+            logging.info(f"{self.pair} Price {price} is below Weekly SMA {sma}")
             return True
         else:
-            logging.info(f"{self.pair} Price {self.get_asset_price()} is above Weekly SMA {sma}")
+            logging.info(f"{self.pair} Price {price} is above Weekly SMA {sma}")
             return False
 
     def above_Weekly_SMA(self, window: int) -> bool:
         """Checks if the current price is above the Weekly SMA."""
         return not self.below_Weekly_SMA(window)
 
-    def accelerate(self, amount: float) -> float:
-        """Accelerates the amount based on the ATH (All Time High) of the asset."""
-        return round(self.get_ath() / self.get_asset_price() * amount, 2)
+    def accelerate(self, amount: float, price: float | None = None) -> float:
+        """Accelerates the amount based on the ATH (All Time High) of the asset, at the given price or the current price."""
+        return round(self.get_ath() / (price or self.get_asset_price()) * amount, 2)
@@ -0,0 +1,211 @@
+"""Technical indicators on float64 NumPy arrays with incremental updates and memoization per series."""
+
+import copy
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+import numpy as np
+import pandas as pd
+
+
+class Indicator(ABC):
+    """Base class of an indicator which is computed over a full series and updated in O(1) for every new value."""
+
+    @abstractmethod
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        """Computes the indicator over the full series and prepares the state for updates with the following values."""
+
+    @abstractmethod
+    def update(self, value: float) -> float:
+        """Adds the next value of the series and returns the indicator value for it."""
+
+
+class SMA(Indicator):
+    """Simple Moving Average."""
+
+    def __init__(self, window: int = 50):
+        self.window = window
+        self.buffer = deque(maxlen=window)
+        self.total = 0.0
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        result = np.full(len(values), np.nan)
+
+        if len(values) >= self.window:
+            cumsum = np.cumsum(np.insert(values, 0, 0.0))
+            result[self.window - 1:] = (cumsum[self.window:] - cumsum[:-self.window]) / self.window
+
+        self.buffer = deque(values[-self.window:].tolist(), maxlen=self.window)
+        self.total = float(np.sum(values[-self.window:]))
+        return result
+
+    def update(self, value: float) -> float:
+        if len(self.buffer) == self.window:
+            self.total -= self.buffer[0]
+
+        self.buffer.append(value)
+        self.total += value
+        return self.total / self.window if len(self.buffer) == self.window else np.nan
+
+
+class EMA(Indicator):
+    """Exponential Moving Average with the smoothing factor 2 / (window + 1)."""
+
+    def __init__(self, window: int = 50):
+        self.window = window
+        self.alpha = 2 / (window + 1)
+        self.last = np.nan
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        result = pd.Series(values).ewm(alpha=self.alpha, adjust=False).mean().to_numpy()
+        self.last = result[-1] if len(result) else np.nan
+        return result
+
+    def update(self, value: float) -> float:
+        self.last = value if np.isnan(self.last) else self.last + self.alpha * (value - self.last)
+        return self.last
+
+
+class RSI(Indicator):
+    """Relative Strength Index with simple moving averages of the gains and losses."""
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.gains = SMA(window)
+        self.losses = SMA(window)
+        self.previous = np.nan
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        change = np.diff(values)
+        result = np.full(len(values), np.nan)
+        result[1:] = _rsi(self.gains.compute(np.clip(change, 0, None)), self.losses.compute(np.clip(-change, 0, None)))
+        self.previous = values[-1] if len(values) else np.nan
+        return result
+
+    def update(self, value: float) -> float:
+        if np.isnan(self.previous):
+            self.previous = value
+            return np.nan
+
+        change = value - self.previous
+        self.previous = value
+        return float(_rsi(np.array([self.gains.update(max(change, 0.0))]), np.array([self.losses.update(max(-change, 0.0))]))[0])
+
+
+class WilderRSI(Indicator):
+    """Relative Strength Index with Wilder's smoothing of the gains and losses."""
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.avg_gain = np.nan
+        self.avg_loss = np.nan
+        self.seed = []
+        self.previous = np.nan
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        self.avg_gain = self.avg_loss = np.nan
+        self.seed = []
+        self.previous = np.nan
+        return np.array([self.update(value) for value in values.tolist()])
+
+    def update(self, value: float) -> float:
+        if np.isnan(self.previous):
+            self.previous = value
+            return np.nan
+
+        change = value - self.previous
+        self.previous = value
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+
+        # The first average is the simple mean of the first window, afterwards the averages are smoothed
+        if np.isnan(self.avg_gain):
+            self.seed.append((gain, loss))
+
+            if len(self.seed) < self.window:
+                return np.nan
+
+            self.avg_gain = sum(g for g, _ in self.seed) / self.window
+            self.avg_loss = sum(l for _, l in self.seed) / self.window
+        else:
+            self.avg_gain = (self.avg_gain * (self.window - 1) + gain) / self.window
+            self.avg_loss = (self.avg_loss * (self.window - 1) + loss) / self.window
+
+        return float(_rsi(np.array([self.avg_gain]), np.array([self.avg_loss]))[0])
+
+
+class ATHDistance(Indicator):
+    """Relative distance of each value to the highest value so far, 0 at an all time high and negative below."""
+
+    def __init__(self):
+        self.ath = -np.inf
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        ath = np.maximum.accumulate(values)
+        self.ath = ath[-1] if len(ath) else -np.inf
+        return values / ath - 1
+
+    def update(self, value: float) -> float:
+        self.ath = max(self.ath, value)
+        return value / self.ath - 1
+
+
+INDICATORS = {
+    "sma": SMA,
+    "ema": EMA,
+    "rsi": RSI,
+    "wilder_rsi": WilderRSI,
+    "ath_distance": ATHDistance,
+}
+
+
+def _rsi(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    """Converts average gains and losses into RSI values."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+_memo = {}
+_memo_lock = threading.Lock()
+
+
+def compute(pair: str, interval: str, name: str, times: np.ndarray, values: np.ndarray, **params) -> np.ndarray:
+    """Returns the indicator for the series, memoized per pair, interval and parameters.
+
+    The last value belongs to the open candle and changes until the candle is closed, therefore the memoized state
+    covers the closed candles only. New closed candles are added with O(1) updates, the open candle is evaluated on a copy of the state.
+    Series with a shifted start like the latest 720 candles continue the memoized state.
+    """
+    if len(values) == 0:
+        return np.array([])
+
+    key = (pair, interval, name, tuple(sorted(params.items())))
+    closed = len(values) - 1
+
+    with _memo_lock:
+        entry = _memo.get(key)
+
+        if entry is not None:
+            memo_times, memo_result, indicator = entry
+            position = int(np.searchsorted(times[:closed], memo_times[-1])) if len(memo_times) else closed
+
+            # The memoized state can only be continued if the newest memoized closed candle is part of the series
+            # and the series does not start before the memoized one, the series may be a window moving forward
+            if position >= closed or times[position] != memo_times[-1] or position >= len(memo_times):
+                entry = None
+
+        if entry is None:
+            indicator = INDICATORS[name](**params)
+            memo_result = indicator.compute(values[:closed])
+        else:
+            updates = [indicator.update(value) for value in values[position + 1:closed].tolist()]
+            memo_result = np.concatenate([memo_result[len(memo_result) - position - 1:], updates])
+
+        _memo[key] = (times[:closed], memo_result, indicator)
+
+        return np.append(memo_result, copy.deepcopy(indicator).update(float(values[-1])))
+
+
+def clear_memo() -> None:
+    """Removes all memoized indicator series."""
+    with _memo_lock:
+        _memo.clear()
@@ -0,0 +1,111 @@
+"""Market data of several assets captured at one point in time, so all decisions and orders of a run use the same prices."""
+
+import json
+import logging
+import os
+import time
+from functools import partial
+from kraken.exceptions import KrakenUnknownAssetError, KrakenUnknownAssetPairError
+from assets.asset import Asset, AssetException
+from utils import market_data
+from utils.concurrency import fan_out
+
+# Candles of the intervals an asset keeps as DataFrames
+INTERVALS = ("1d", "1w")
+
+
+class MarketSnapshot:
+    """Tickers, candles and pair metadata of several pairs, failed parts are kept as errors which are raised on access."""
+
+    def __init__(self, taken: float, tickers: dict, candles: dict, metadata: dict, errors: dict | None = None):
+        self.taken = taken
+        self.tickers = tickers
+        self.candles_by_key = candles
+        self.metadata = metadata
+        self.errors = errors or {}
+
+    @classmethod
+    def capture(cls, assets: list[Asset], intervals: tuple[str, ...] = INTERVALS, length: int = 720) -> "MarketSnapshot":
+        """Loads the market data of the assets with one ticker request, one asset pair request and concurrent candle updates."""
+        pairs = list(dict.fromkeys(asset.pair for asset in assets))
+        calls = {"tickers": partial(market_data.get_tickers, pairs), "metadata": partial(market_data.get_pair_metadata, pairs)}
+
+        for asset in {asset.pair: asset for asset in assets}.values():
+            for interval in intervals:
+                calls[f"{asset.pair} {interval}"] = partial(asset.load_candles, asset.pair, interval, length)
+
+        errors = {}
+        results = fan_out({key: partial(_capture, errors, key, call) for key, call in calls.items()})
+
+        return cls(
+            taken=time.time(),
+            tickers=results.pop("tickers") or {},
+            metadata=results.pop("metadata") or {},
+            candles={key: candles for key, candles in results.items() if candles is not None},
+            errors=errors,
+        )
+
+    def _missing(self, what: str, key: str) -> AssetException:
+        """Returns the exception for data which the snapshot does not contain."""
+        error = self.errors.get(key) or self.errors.get(what)
+        return AssetException(f"No {what} of {key} in the market snapshot" + (f": {error}" if error else ""))
+
+    def ticker(self, pair: str) -> dict:
+        """Returns the Kraken ticker of the pair."""
+        if pair not in self.tickers:
+            raise self._missing("tickers", pair)
+
+        return self.tickers[pair]
+
+    def price(self, pair: str) -> float:
+        """Returns the last trade price of the pair."""
+        return float(self.ticker(pair)["c"][0])
+
+    def candles(self, pair: str, interval: str) -> list:
+        """Returns the candles of the pair and interval as Kraken OHLC rows in ascending order."""
+        key = f"{pair} {interval}"
+
+        if key not in self.candles_by_key:
+            raise self._missing("candles", key)
+
+        return self.candles_by_key[key]
+
+    def limits(self, pair: str) -> dict:
+        """Returns the order minimum and the decimals of the pair."""
+        if pair not in self.metadata:
+            raise self._missing("metadata", pair)
+
+        return self.metadata[pair]
+
+    def to_dict(self) -> dict:
+        """Returns the snapshot as JSON serializable dict."""
+        return {"taken": self.taken, "tickers": self.tickers, "candles": self.candles_by_key, "metadata": self.metadata, "errors": self.errors}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MarketSnapshot":
+        """Restores a snapshot of to_dict."""
+        return cls(data["taken"], data["tickers"], data["candles"], data["metadata"], data.get("errors"))
+
+    def save(self, path: str) -> None:
+        """Writes the snapshot to a JSON file, it is replaced atomically so an interrupted write keeps the previous snapshot."""
+        with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file)
+
+        os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def load(cls, path: str) -> "MarketSnapshot":
+        """Reads a snapshot written by save, for example to replay an accumulation run."""
+        with open(path, encoding="utf-8") as file:
+            return cls.from_dict(json.load(file))
+
+
+def _capture(errors: dict, key: str, call):
+    """Returns the result of a capture call, a failure is logged and recorded under the key and None is returned."""
+    try:
+        return call()
+
+    except (AssetException, KrakenUnknownAssetError, KrakenUnknownAssetPairError) as e:
+        errors[key] = str(e).replace("\n", " ")
+        logging.error(f"Capturing {key} failed: {errors[key]}")
+        return None
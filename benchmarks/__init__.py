@@ -0,0 +1 @@
+"""Benchmarks for performance critical code paths."""
@@ -0,0 +1,53 @@
+"""Benchmark of the Kraken OHLC parsing: run with python -m benchmarks.bench_data_converter"""
+
+import time
+import timeit
+import pandas as pd
+from utils.data_converter import ohlc_to_dataframe
+
+DAY = 86400
+
+
+def kraken_payload(rows: int) -> list:
+    """Creates OHLC rows in the Kraken API format where prices and volumes are strings."""
+    start = int(time.time()) - rows * DAY
+    return [
+        [start + i * DAY, f"{30000 + i:.1f}", f"{30500 + i:.1f}", f"{29500 + i:.1f}", f"{30200 + i:.1f}", f"{30100 + i:.1f}", f"{12.3456789 + i:.8f}", 1000 + i]
+        for i in range(rows)
+    ]
+
+
+def legacy_ohlc_to_dataframe(ohlc_data: list) -> pd.DataFrame:
+    """The previous converter which left the prices as strings, consumers converted the columns with astype(float)."""
+    df = pd.DataFrame(ohlc_data, columns=["time", "open", "high", "low", "close", "vwap", "volume", "count"])
+    df["time"] = pd.to_datetime(df["time"], unit="s")
+    return df
+
+
+def legacy_with_conversion(ohlc_data: list) -> pd.DataFrame:
+    """The previous converter including the float conversion of the close and high columns done by the indicators."""
+    df = legacy_ohlc_to_dataframe(ohlc_data)
+    df["close"].astype(float)
+    df["high"].astype(float)
+    return df
+
+
+def main() -> None:
+    """Prints parse time and memory of the legacy and the typed converter for a Kraken window and multi-year payloads."""
+    print(f"{'rows':>6} {'converter':<10} {'parse ms':>10} {'memory KiB':>11}")
+
+    for rows in (720, 3650, 36500):
+        payload = kraken_payload(rows)
+
+        for name, parse, converter in (
+            ("legacy", legacy_with_conversion, legacy_ohlc_to_dataframe),
+            ("typed", ohlc_to_dataframe, ohlc_to_dataframe),
+        ):
+            runs = max(3, 20000 // rows)
+            seconds = min(timeit.repeat(lambda: parse(payload), number=runs, repeat=3)) / runs
+            memory = converter(payload).memory_usage(deep=True).sum() / 1024
+            print(f"{rows:>6} {name:<10} {seconds * 1000:>10.3f} {memory:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Benchmark of the cold start import time of the function app and its handlers: run with python -m benchmarks.import_time"""
+
+import os
+import subprocess
+import sys
+
+# Modules loaded by a cold start of the function app and by the first invocation of each handler
+ENTRY_POINTS = ["function_app", "routes.index", "routes.balance", "routes.ticker", "routes.simulations", "timers.accumulate"]
+
+# Third party packages whose import time is reported separately
+DEPENDENCIES = ["azure.functions", "jinja2", "kraken.spot", "numpy", "pandas", "plotly", "yfinance"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Imports the module in a fresh interpreter and returns the cumulative import time of every loaded module in microseconds."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+
+    return times
+
+
+def main() -> None:
+    """Prints the total import time of every entry point and the share of the heavy dependencies."""
+    print(f"{'module':<20} {'total ms':>9} " + " ".join(f"{name:>15}" for name in DEPENDENCIES))
+
+    for module in ENTRY_POINTS:
+        times = import_times(module)
+        columns = " ".join(f"{times[name] / 1000:>15.1f}" if name in times else f"{'-':>15}" for name in DEPENDENCIES)
+        print(f"{module:<20} {times[module] / 1000:>9.1f} {columns}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""Offline benchmark suite with committed baselines: run with python -m benchmarks.suite [--update] [case ...]
+
+Kraken and Yahoo Finance responses are replayed from a cassette, so the routes are measured without network access.
+Every case is timed relative to a reference measured in the same run, the legacy implementation where the case replaced one
+and a fixed calibration workload otherwise, so the baselines in benchmarks/baselines.json hold machine independent ratios.
+A case fails if its ratio is above its baseline times CB0TBENCHTOLERANCE (2 by default) or if it has no baseline,
+--update records the ratios of the selected cases again.
+"""
+
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import time
+from typing import Callable
+import azure.functions as func
+import numpy as np
+import pandas as pd
+from benchmarks.bench_data_converter import kraken_payload, legacy_with_conversion
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+FIXTURE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures", "btc_usd_daily.csv")
+PAGE_SIZE = 50
+WEEK = 604800
+
+# Assets of the synthetic account, the pairs match the balance route
+ACCOUNT = {"XXBT": ("XXBTZEUR", 50000.0), "XETH": ("XETHZEUR", 3000.0), "SOL": ("SOLEUR", 150.0), "PAXG": ("PAXGEUR", 2500.0)}
+
+
+def synthetic_trades(count: int, pairs: list[str], start: int = 1600000000) -> dict:
+    """Creates buy and sell trades in the format of the Kraken trade history, one trade per hour over the pairs."""
+    trades = {}
+
+    for i in range(count):
+        pair = pairs[i % len(pairs)]
+        price = 100 + (i % 997)
+        vol = 0.01 + (i % 13) / 100
+        trades[f"T{i:07d}"] = {
+            "pair": pair,
+            "time": start + i * 3600,
+            "type": "sell" if i % 10 == 9 else "buy",
+            "vol": f"{vol:.8f}",
+            "cost": f"{vol * price:.5f}",
+            "fee": f"{vol * price * 0.0026:.5f}",
+        }
+
+    return trades
+
+
+def write_cassette(path: str, trades: int) -> None:
+    """Writes the cassette of the balance and simulations routes with a synthetic account and the Bitcoin CSV fixture."""
+    from services.price_history import CsvProvider  # pylint: disable=import-outside-toplevel
+    from utils.replay import cassette_key  # pylint: disable=import-outside-toplevel
+
+    history = synthetic_trades(trades, [pair for pair, _ in ACCOUNT.values()])
+    newest_first = dict(sorted(history.items(), key=lambda item: item[1]["time"], reverse=True))
+    ids = list(newest_first)
+
+    responses = {
+        cassette_key("kraken.private", "User.get_account_balance"): {"ZEUR": "1234.56", **{asset: "1.5" for asset in ACCOUNT}},
+        cassette_key("kraken.public", "Market.get_ticker", ([pair for pair, _ in ACCOUNT.values()],)): {
+            pair: {"c": [f"{price}", "1"]} for pair, price in ACCOUNT.values()
+        },
+        cassette_key("yfinance", "history", ("BTC-USD",)): CsvProvider(FIXTURE_CSV).fetch("BTC-USD").to_dict("list"),
+        **{cassette_key("kraken.public", "Market.get_ohlc", (pair, 1440)): {pair: kraken_payload(720)} for pair, _ in ACCOUNT.values()},
+    }
+
+    # The pages after the first one end at the newest trade
+    end = math.ceil(newest_first[ids[0]]["time"])
+
+    for offset in range(0, trades, PAGE_SIZE):
+        page = {txid: newest_first[txid] for txid in ids[offset:offset + PAGE_SIZE]}
+        params = {"end": end, "ofs": offset} if offset else {"ofs": offset}
+        responses[cassette_key("kraken.private", "User.get_trades_history", (), params)] = {"count": trades, "trades": page}
+
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(responses, file)
+
+
+def calibration() -> Callable[[], object]:
+    """A fixed pandas, numpy and pure Python workload, the reference of the cases without a legacy implementation."""
+    values = np.random.default_rng(0).random(200000)
+    frame = pd.DataFrame({"close": values[:20000]})
+
+    def run():
+        sorted(values[:50000].tolist())
+        np.cumsum(values)
+        return frame["close"].rolling(14).mean()
+
+    return run
+
+
+def case_ohlc_to_dataframe(rows: int) -> Callable[[], object]:
+    """Parses a Kraken OHLC payload."""
+    from utils.data_converter import ohlc_to_dataframe  # pylint: disable=import-outside-toplevel
+
+    payload = kraken_payload(rows)
+    return lambda: ohlc_to_dataframe(payload)
+
+
+def legacy_ohlc_to_dataframe(rows: int) -> Callable[[], object]:
+    """Parses a Kraken OHLC payload with the legacy string converter and the float conversion of its consumers."""
+    payload = kraken_payload(rows)
+    return lambda: legacy_with_conversion(payload)
+
+
+def _asset():
+    """Creates a Bitcoin asset with synthetic daily and weekly candles."""
+    from assets.asset import Asset  # pylint: disable=import-outside-toplevel
+    from utils.data_converter import ohlc_to_dataframe  # pylint: disable=import-outside-toplevel
+
+    payload = kraken_payload(720)
+    asset = Asset("XXBTZEUR")
+    asset.df_1d = ohlc_to_dataframe(payload)
+    asset.df_1w = ohlc_to_dataframe([[payload[0][0] + i * WEEK, *row[1:]] for i, row in enumerate(payload)])
+    return asset
+
+
+def case_indicator(name: str) -> Callable[[], object]:
+    """Calculates an indicator of a fresh asset, the indicator memo is cleared before every run."""
+    from assets import indicators  # pylint: disable=import-outside-toplevel
+
+    asset = _asset()
+
+    def run():
+        indicators.clear_memo()
+        return getattr(asset, name)()
+
+    return run
+
+
+def case_cost_basis(trades: int) -> Callable[[], object]:
+    """Calculates the cost basis of one asset over a ledger with the given number of trades of the pair."""
+    from assets.asset_pairs import BTCEUR  # pylint: disable=import-outside-toplevel
+    from services.cost_basis import calculate_cost_bases  # pylint: disable=import-outside-toplevel
+    from services.trade_ledger import get_ledger  # pylint: disable=import-outside-toplevel
+
+    # Every ledger size gets its own data directory, the amount covers most of the bought volume
+    os.environ["CB0TDATA"] = tempfile.mkdtemp(prefix=f"cb0t-cost-basis-{trades}-")
+    get_ledger().add(synthetic_trades(trades, ["XXBTZEUR"]))
+    amount = sum(0.01 + (i % 13) / 100 for i in range(trades)) * 0.7
+
+    return lambda: calculate_cost_bases([(BTCEUR(), amount)], sync=False)
+
+
+def case_route(module: str, name: str) -> Callable[[], object]:
+    """Calls a route with the replayed responses, the market data and result caches are cleared before every run."""
+    import importlib  # pylint: disable=import-outside-toplevel
+    from routes import simulations  # pylint: disable=import-outside-toplevel
+    from utils import market_data  # pylint: disable=import-outside-toplevel
+
+    handler = getattr(importlib.import_module(module), name)
+    req = func.HttpRequest(method="GET", body=None, url=f"/api/{name}", params={})
+
+    def run():
+        market_data.clear_caches()
+        simulations.simulation_results.clear()
+        response = handler(req)
+        assert response.status_code == 200, response.get_body()
+        return response
+
+    return run
+
+
+# Every case has the factory of its run and of the reference it is timed against
+CASES = {
+    "ohlc_to_dataframe_720": (lambda: case_ohlc_to_dataframe(720), lambda: legacy_ohlc_to_dataframe(720)),
+    "ohlc_to_dataframe_36500": (lambda: case_ohlc_to_dataframe(36500), lambda: legacy_ohlc_to_dataframe(36500)),
+    "calculate_rsi": (lambda: case_indicator("calculate_rsi"), calibration),
+    "calculate_sma": (lambda: case_indicator("calculate_sma"), calibration),
+    "cost_basis_10k": (lambda: case_cost_basis(10000), calibration),
+    "cost_basis_100k": (lambda: case_cost_basis(100000), calibration),
+    "get_balance": (lambda: case_route("routes.balance", "get_balance"), calibration),
+    "get_simulations": (lambda: case_route("routes.simulations", "get_simulations"), calibration),
+}
+
+
+def measure(run: Callable[[], object], min_seconds: float = 1.0, max_rounds: int = 500) -> float:
+    """Runs the case at least 3 times and until min_seconds are spent, returns the best time in seconds."""
+    times = []
+
+    while len(times) < 3 or (sum(times) < min_seconds and len(times) < max_rounds):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def main(argv: list[str]) -> int:
+    """Runs the selected cases, compares them with the baselines and returns 1 if a case regressed."""
+    update = "--update" in argv
+    selected = [arg for arg in argv if not arg.startswith("--")] or list(CASES)
+    tolerance = float(os.getenv("CB0TBENCHTOLERANCE", "2"))
+
+    logging.disable(logging.WARNING)
+    directory = tempfile.mkdtemp(prefix="cb0t-bench-")
+    os.environ.update({"CB0TDATA": directory, "CB0TCASSETTE": os.path.join(directory, "cassette.json"), "CB0TCASSETTEMODE": "replay"})
+    os.environ.pop("CB0THISTORYCSV", None)
+    write_cassette(os.environ["CB0TCASSETTE"], trades=500)
+
+    baselines = {}
+    if os.path.exists(BASELINES):
+        with open(BASELINES, encoding="utf-8") as file:
+            baselines = json.load(file)
+
+    regressions = []
+    print(f"{'case':<26} {'best ms':>10} {'reference ms':>13} {'ratio':>7} {'baseline':>9}")
+
+    for name in selected:
+        os.environ["CB0TDATA"] = directory
+        case, reference = CASES[name]
+        seconds, reference_seconds = measure(case()), measure(reference())
+        ratio = seconds / reference_seconds
+        baseline = baselines.get(name)
+
+        print(f"{name:<26} {seconds * 1000:>10.2f} {reference_seconds * 1000:>13.2f} {ratio:>7.3f} {baseline or float('nan'):>9.3f}")
+
+        if update:
+            baselines[name] = round(ratio, 4)
+        elif baseline is None or ratio > baseline * tolerance:
+            regressions.append(name)
+
+    if update:
+        with open(BASELINES, "w", encoding="utf-8") as file:
+            json.dump(baselines, file, indent=2, sort_keys=True)
+            file.write("\n")
+
+    if regressions:
+        print(f"Regressions above {tolerance}x their baseline ratio or without a baseline: {', '.join(regressions)}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,20 +1,39 @@
 """Main Azure Functions entry point that registers all routes and triggers."""
 
+import importlib
 import os
 import azure.functions as func
-from routes.index import index
-from routes.simulations import get_simulations
-from routes.ticker import get_ticker
-from routes.balance import get_balance
-from timers.accumulate import accumulate_assets
+from utils.metrics import invocation
 
 app = func.FunctionApp()
 
+
+def lazy_route(module: str, name: str):
+    """Returns an HTTP handler which imports the route module on its first request, so a cold start only loads the invoked route."""
+
+    def handler(req: func.HttpRequest) -> func.HttpResponse:
+        with invocation(name):
+            return getattr(importlib.import_module(module), name)(req)
+
+    # The function name of the Azure Functions host is taken from the handler name
+    handler.__name__ = handler.__qualname__ = name
+    return handler
+
+
+def accumulate_assets(timer: func.TimerRequest) -> None:
+    """Accumulates crypto periodically, the accumulation modules are imported on the first run."""
+    with invocation("accumulate_assets"):
+        from timers.accumulate import accumulate_assets as run  # pylint: disable=import-outside-toplevel
+
+        run(timer)
+
+
 # Register HTTP routes
-app.route(route="{*path}", auth_level="anonymous", methods=["GET"])(index)
-app.route(route="balance", auth_level="anonymous", methods=["GET"])(get_balance)
-app.route(route="ticker", auth_level="anonymous", methods=["GET"])(get_ticker)
-app.route(route="simulations", auth_level="anonymous", methods=["GET"])(get_simulations)
+app.route(route="{*path}", auth_level="anonymous", methods=["GET"])(lazy_route("routes.index", "index"))
+app.route(route="balance", auth_level="anonymous", methods=["GET"])(lazy_route("routes.balance", "get_balance"))
+app.route(route="ticker", auth_level="anonymous", methods=["GET"])(lazy_route("routes.ticker", "get_ticker"))
+app.route(route="simulations", auth_level="anonymous", methods=["GET"])(lazy_route("routes.simulations", "get_simulations"))
+app.route(route="metrics", auth_level="anonymous", methods=["GET"])(lazy_route("routes.metrics", "get_metrics"))
 
 # Register timer trigger
 env = os.getenv("CB0TENV", "DEV")
@@ -1,16 +1,20 @@
 """Balance-related HTTP routes."""
+import json
 import logging
+from functools import partial
 import azure.functions as func
-from services.cost_basis import calculate_cost_basis
+from services.cost_basis import calculate_cost_bases, sync_trades
+from services.lots import get_lot_accounts
+from services.portfolio import get_portfolio_history
+from assets.asset import Asset, AssetException, get_asset_prices
 from assets.asset_pairs import BTCEUR, ETHEUR, SOLEUR, PAXGEUR
+from utils.concurrency import fan_out, private_call
 from utils.html_renderer import html
 from utils.kraken_client import user
 
 
 def get_balance(req: func.HttpRequest) -> func.HttpResponse:
     """Fetches and returns the account balance from Kraken."""
-    account_balance = user.get_account_balance()
-
     asset_to_eur_map = {
         "XXBT": BTCEUR(),
         "XETH": ETHEUR(),
@@ -18,7 +22,11 @@ def get_balance(req: func.HttpRequest) -> func.HttpResponse:
         "PAXG": PAXGEUR(),
     }
 
+    # Signed requests are sent one at a time, the account balance comes first to only price the held assets
+    account_balance = private_call(user.get_account_balance)
+
     balance = {}
+    holdings = {}
 
     for asset, amount_str in account_balance.items():
         amount = float(amount_str)
@@ -37,23 +45,43 @@ def get_balance(req: func.HttpRequest) -> func.HttpResponse:
             }
             continue
 
-        asset_pair = asset_to_eur_map[asset]
+        asset_pair = asset_to_eur_map.get(asset)
 
         if asset_pair is None:
             logging.warning(f"No asset pair found for {asset}, skipping.")
             continue
 
-        cost_basis = calculate_cost_basis(asset_pair, amount)
+        # Reserve the position in the balance, the values are filled after the cost basis calculation
+        balance[asset] = None
+        holdings[asset] = (asset_pair, amount)
+
+    # The public price and candle requests run while the trade history is synchronised
+    results = fan_out({
+        "trades_synced": sync_trades,
+        "prices": partial(get_asset_prices, [asset_pair for asset_pair, _ in holdings.values()]),
+        **{f"candles {asset_pair.pair}": partial(_load_daily_candles, asset_pair) for asset_pair, _ in holdings.values()},
+    })
+    prices = results["prices"]
+
+    # Calculate the cost basis of all held assets at once from the local trade ledger which is already synchronised
+    if not results["trades_synced"]:
+        logging.warning("Trade ledger could not be synchronised, the cost basis is based on the stored trades.")
+
+    cost_bases = calculate_cost_bases(list(holdings.values()), sync=False)
+
+    for asset, (asset_pair, amount) in holdings.items():
+        cost_basis = cost_bases[asset_pair.pair]
+        price = prices[asset_pair.pair]
 
         balance[asset] = {
             "amount": amount,
-            "price": amount * asset_pair.get_asset_price(),
+            "price": amount * price,
             "cost_basis": cost_basis,
             "average_price": cost_basis / amount if amount > 0 else 0,
-            "unrealized_pnl": asset_pair.get_asset_price() * amount - cost_basis,
+            "unrealized_pnl": price * amount - cost_basis,
             "unrealized_pnl_pct": (
                 (
-                    (asset_pair.get_asset_price() * amount - cost_basis)
+                    (price * amount - cost_basis)
                     / cost_basis
                     * 100
                 )
@@ -62,4 +90,50 @@ def get_balance(req: func.HttpRequest) -> func.HttpResponse:
             ),
         }
 
-    return html(template="balance.html.j2", balance=balance)
+    lots = _lot_positions(prices)
+    portfolio = _portfolio_series([asset_pair.pair for asset_pair, _ in holdings.values()])
+
+    return html(template="balance.html.j2", request=req, balance=balance, lots=lots, portfolio=portfolio)
+
+
+def _lot_positions(prices: dict[str, float]) -> dict[str, dict]:
+    """Returns the realized and unrealized PnL of the held pairs from the lot accounts, empty if they cannot be updated."""
+    try:
+        return get_lot_accounts().positions(prices)
+
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        # The balance is still shown, only the lot accounting section is left out
+        logging.error(f"Lot accounts could not be updated: {e}")
+        return {}
+
+
+def _load_daily_candles(asset_pair: Asset) -> None:
+    """Tops up the stored daily candles of a held pair for the portfolio history, a failure only leaves the pair out of the chart."""
+    try:
+        asset_pair.load_candles(asset_pair.pair, "1d")
+
+    except AssetException as e:
+        logging.warning(f"{asset_pair.pair} daily candles not loaded: {e}")
+
+
+def _portfolio_series(pairs: list[str]) -> str:
+    """Returns the daily portfolio value, cost basis and PnL of the last year as compact JSON series, empty without stored candles."""
+    try:
+        total = get_portfolio_history().total(pairs).iloc[-365:]
+
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        # The balance is still shown, only the portfolio chart is left out
+        logging.error(f"Portfolio history of {', '.join(pairs)} failed: {e}")
+        return ""
+
+    if total.empty:
+        return ""
+
+    series = {
+        "t": [int(date.timestamp()) for date in total.index],
+        "value": total["value"].round(2).tolist(),
+        "cost": total["cost_basis"].round(2).tolist(),
+        "pnl": total["pnl"].round(2).tolist(),
+    }
+
+    return json.dumps(series, separators=(",", ":"))
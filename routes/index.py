@@ -6,4 +6,4 @@ from utils.html_renderer import html
 
 def index(req: func.HttpRequest) -> func.HttpResponse:
     """Renders the main index page."""
-    return html(template="index.html.j2", headers=req.method)
+    return html(template="index.html.j2", request=req, headers=req.method)
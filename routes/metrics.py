@@ -0,0 +1,20 @@
+"""Metrics HTTP route."""
+
+import azure.functions as func
+from utils import concurrency, kraken_client, market_data  # pylint: disable=unused-import
+from utils.metrics import prometheus
+
+
+def get_metrics(req: func.HttpRequest) -> func.HttpResponse:
+    """Returns the call latencies, cache hit rates and Kraken client counters of this instance in the Prometheus text format."""
+    lines = ["# HELP cb0t_kraken_calls_total Kraken REST calls of the scheduler by endpoint class.", "# TYPE cb0t_kraken_calls_total counter"]
+
+    for endpoint, counts in sorted(concurrency.scheduler.stats.items()):
+        lines += [f'cb0t_kraken_calls_total{{endpoint="{endpoint}",kind="{kind}"}} {count}' for kind, count in sorted(counts.items())]
+
+    lines += ["# HELP cb0t_kraken_connections_total Requests and connections of the shared Kraken clients.", "# TYPE cb0t_kraken_connections_total counter"]
+
+    for client, counts in sorted(kraken_client.connection_stats().items()):
+        lines += [f'cb0t_kraken_connections_total{{client="{client}",kind="{kind}"}} {count}' for kind, count in counts.items()]
+
+    return func.HttpResponse(prometheus() + "\n".join(lines) + "\n", mimetype="text/plain", status_code=200)
@@ -1,47 +1,57 @@
 """Environment-related HTTP routes."""
 
-import os
+import json
 import logging
+import os
 import azure.functions as func
-import yfinance as yf
 import pandas as pd
+from services.backtest import run_strategy, summarize
+from services.price_history import PriceHistory, get_price_history
 from utils.html_renderer import html
+from utils.result_cache import ResultCache
+
+# Accumulation strategies with their signal rules, the euro amount per buy and the sizing of the amount
+STRATEGIES = {
+    "Below SMA 125": {"rules": [{"rule": "below_sma", "window": 125}], "euro": 8, "sizing": "fixed"},
+    "Below weekly SMA 200, every 2nd day": {
+        "rules": [{"rule": "below_weekly_sma", "window": 200}, {"rule": "every_n_days", "n": 2}],
+        "euro": 8,
+        "sizing": "accelerate",
+    },
+    "RSI below 35": {"rules": [{"rule": "rsi_below", "threshold": 35}], "euro": 4, "sizing": "accelerate"},
+    "Daily DCA": {"rules": [], "euro": 8, "sizing": "fixed"},
+}
+
+# Rendered simulation results per strategy set, valid for one version of the price history
+simulation_results = ResultCache(stale_while_revalidate=os.getenv("CB0TSTALEWHILEREVALIDATE", "1") == "1")
 
 
 def get_simulations(req: func.HttpRequest) -> func.HttpResponse:
     """This function executes different simulations with the simple moving average inverstment approach."""
+    history = get_price_history("BTC-USD")
+    key = ("BTC-USD", json.dumps(STRATEGIES, sort_keys=True))
 
-    # Load Bitcoin USD OHLC data from Yahoo Finance (all-time history with daily timeframes)
-    btc_ticker = yf.Ticker("BTC-USD")
-    df = btc_ticker.history(period="max", interval="1d")
+    # The results are only recomputed for new price data, while the history is refreshed the previous results are served
+    results = simulation_results.get(key, history.version(), lambda: _simulate(history), revalidate=history.needs_refresh())
 
-    # Remove unnecessary columns
-    df = df.drop(columns=["Dividends", "Stock Splits"])
+    return html("simulations.html.j2", request=req, **results)
 
-    # Trim DataFrame to the last 3560 entries for performance
-    df = df.tail(3560)
 
-    # Reset index to make Date a column instead of index
-    df = df.reset_index()
+def _simulate(history: PriceHistory) -> tuple[int, dict]:
+    """Runs all strategies over the price history and returns the history version with the rendered result tables."""
 
-    # Calculate 125-day moving average
-    df["SMA_125"] = df["Close"].rolling(window=125).mean()
+    # Load the Bitcoin USD daily history (last 3560 days for performance) from the local cache, refreshed from Yahoo Finance
+    prices = history.load(3560)
 
-    # Store the size of the dataframe
-    dataframe_size = len(df)
+    logging.info(f"Simulating {len(STRATEGIES)} strategies over {len(prices)} days")
 
-    # Print data info to log
-    logging.info(f"DataFrame size: {dataframe_size}")
-    logging.info(f"DataFrame columns: {df.columns.tolist()}")
+    curves = {name: run_strategy(prices, **strategy) for name, strategy in STRATEGIES.items()}
+    summary = pd.DataFrame.from_dict({name: summarize(curve) for name, curve in curves.items()}, orient="index")
 
-    # Iterate over the DataFrame
-    for index, row in df.iterrows():
-        # Process each row
-        if row["Close"] < row["SMA_125"]:
-            logging.warning(f"Bearish signal on {row['Date']}: Close {row['Close']} < SMA_125 {row['SMA_125']}")
-        else:
-            logging.info(f"Bullish signal on {row['Date']}: Close {row['Close']} >= SMA_125 {row['SMA_125']}")
-        # Your logic here
-        pass
+    # Show the last days of the strategy which is used by the accumulation timer
+    curve = curves["Below weekly SMA 200, every 2nd day"]
 
-    return html("simulations.html.j2", dataframe=df.tail().to_html(classes="table table-dark table-striped table-hover"))
+    return history.version(), {
+        "summary": summary.to_html(classes="table table-dark table-striped table-hover"),
+        "dataframe": curve.tail().to_html(classes="table table-dark table-striped table-hover"),
+    }
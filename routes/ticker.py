@@ -1,53 +1,88 @@
 """Ticker-related HTTP routes."""
 
+import json
 import logging
+import os
 import azure.functions as func
 import pandas as pd
-import plotly.graph_objects as go
 from datetime import datetime
-from kraken.spot import Market
 from kraken.exceptions import KrakenUnknownAssetError, KrakenUnknownAssetPairError
-from utils.html_renderer import html
-from utils.data_converter import ohlc_to_dataframe
+from utils.html_renderer import html, jinja_env
+from utils.data_converter import ohlc_to_arrays, ohlc_to_dataframe
+from utils.result_cache import ResultCache
+from utils import market_data
+
+# Rendered charts per pair and chart type, valid for one version of the candles, the pair is user input so the cache is bounded
+charts = ResultCache(stale_while_revalidate=False, max_entries=int(os.getenv("CB0TCHARTCACHESIZE", "32")))
 
 
 def get_ticker(req: func.HttpRequest) -> func.HttpResponse:
     """
     HTTP triggered function to handle requests to get the latest ticker information for the Kraken ticker.
-    The parameter 'pair' can be provided to specify which asset pairs to retrieve ticker information for.
+    The parameter 'pair' can be provided to specify which asset pair to retrieve ticker information for.
+    The parameter 'chart' selects the compact SVG chart (default) or the interactive Plotly chart.
     """
     pair = req.params.get("pair")
+    chart_type = req.params.get("chart", "svg")
+
+    if chart_type not in CHARTS:
+        return func.HttpResponse(f"Unknown chart {chart_type}, available charts are {', '.join(CHARTS)}", status_code=400)
 
-    # Default asset pairs if none are provided
+    # Default asset pair if none is provided
     if not pair:
         pair = "XXBTZEUR"
 
+    # The OHLC endpoint and the chart serve a single pair
+    if "," in pair:
+        return func.HttpResponse(f"Only one pair is supported, received {pair}", status_code=400)
+
     logging.debug(f"Ticker function is processing with pair: {pair}")
 
     try:
         # Fetch ticker and asset pair information from Kraken Market
-        ticker = Market().get_ticker(pair)
+        ticker = market_data.get_tickers([pair])
 
         # Fetch asset pair details
-        assets = Market().get_asset_pairs(pair)
+        assets = market_data.get_asset_pairs(pair)
 
         # Load ohlc data for each asset pair with weekly closing interval
-        ohlc = Market().get_ohlc(pair, 10080)
+        ohlc = market_data.get_ohlc(pair, 10080)
 
         logging.debug(f"Ticker data: {ticker}")
 
-        # Create candlestick chart from OHLC data
-        chart = _create_candlestick_chart(ohlc, pair)
+        # Create candlestick chart from OHLC data, it is only rendered again when the candles change
+        chart = _get_chart(ohlc, pair, chart_type)
 
     except (KrakenUnknownAssetError, KrakenUnknownAssetPairError) as e:
         logging.error(str(e))
         return func.HttpResponse(str(e), status_code=500)
 
-    return html(template="ticker.html.j2", pair=pair, ticker=ticker, assets=assets, chart=chart)
+    return html(template="ticker.html.j2", request=req, pair=pair, ticker=ticker, assets=assets, chart=chart)
+
+
+def _get_chart(ohlc_data: dict, pair: str, chart_type: str) -> str:
+    """Returns the chart of the OHLC data from the cache, the version of the candles is the time and close of the latest candle."""
+    data = next(iter(ohlc_data.values()), [])
+    version = (data[-1][0], data[-1][4]) if data else None
+
+    return charts.get((pair, chart_type), version, lambda: (version, CHARTS[chart_type](ohlc_data, pair)))
+
+
+def _create_svg_chart(ohlc_data: dict, pair: str) -> str:
+    """Create a candlestick chart from OHLC data as compact candle series which a small script draws as SVG in the browser."""
+    arrays = ohlc_to_arrays(next(iter(ohlc_data.values()), []))
+
+    # Keep only the latest 365 data points, the prices keep the decimals sent by Kraken
+    series = {column[0]: arrays[column][-365:].tolist() for column in ("time", "open", "high", "low", "close")}
+    series["sma"] = 50
+
+    return jinja_env.get_template("candlestick_chart.html.j2").render(title=f"{pair} Price Chart", series=json.dumps(series, separators=(",", ":")))
 
 
 def _create_candlestick_chart(ohlc_data: dict, pair: str) -> str:
     """Create interactive candlestick chart from OHLC data using Plotly."""
+    import plotly.graph_objects as go  # pylint: disable=import-outside-toplevel
+
     fig = go.Figure()
 
     # Extract OHLC data
@@ -75,3 +110,6 @@ def _create_candlestick_chart(ohlc_data: dict, pair: str) -> str:
     fig.update_layout(title="Price Chart", xaxis_title="Date", yaxis_title="Price", template="plotly_dark", height=600, xaxis_rangeslider_visible=False)
 
     return fig.to_html(include_plotlyjs="cdn", div_id="candlestick-chart")
+
+
+CHARTS = {"svg": _create_svg_chart, "plotly": _create_candlestick_chart}
@@ -0,0 +1,111 @@
+"""Configuration driven accumulation plan and its runner."""
+
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from assets.asset import Asset, AssetException
+from assets.asset_pairs import BTCEUR, BTCUSD, BTCUSDC, ETHEUR, ETHUSD, PAXGEUR, SOLEUR, SOLUSD
+from assets.market_snapshot import MarketSnapshot
+from services.trading import accumulate_batch
+from utils.storage import data_path
+
+ASSETS = {cls.__name__: cls for cls in (BTCUSD, BTCUSDC, BTCEUR, ETHUSD, ETHEUR, SOLUSD, SOLEUR, PAXGEUR)}
+
+# Every entry accumulates the euro amount of the asset if all rules apply, CB0TPLAN can replace the plan with JSON
+DEFAULT_PLAN = [
+    {"asset": "BTCEUR", "rules": [{"rule": "below_weekly_sma", "window": 200}, {"rule": "every_n_days", "n": 2}], "euro": 8},
+    {"asset": "ETHEUR", "rules": [{"rule": "below_weekly_sma", "window": 200}, {"rule": "every_n_days", "n": 2}], "euro": 4, "enabled": False},
+    {"asset": "SOLEUR", "rules": [{"rule": "rsi_below", "threshold": 35}], "euro": 4, "enabled": False},
+]
+
+# Live evaluation of the rules, the names match the signals of the backtest engine
+RULES = {
+    "below_weekly_sma": lambda asset, window=200: asset.below_Weekly_SMA(window),
+    "rsi_below": lambda asset, threshold=35: asset.RSI_below(threshold),
+    "below_sma": lambda asset, window=125: asset.get_asset_price() < asset.get_indicator("sma", "1d", window=window)[-1],
+    "every_n_days": lambda asset, n=2: datetime.now().day % n == 0,
+}
+
+
+def load_plan() -> list[dict]:
+    """Returns the enabled entries of the accumulation plan from CB0TPLAN or the default plan."""
+    plan = json.loads(os.environ["CB0TPLAN"]) if os.getenv("CB0TPLAN") else DEFAULT_PLAN
+
+    for entry in plan:
+        if entry["asset"] not in ASSETS:
+            raise ValueError(f"Unknown asset {entry['asset']} in accumulation plan, known assets are {', '.join(ASSETS)}")
+
+        for rule in entry.get("rules", []):
+            if rule["rule"] not in RULES:
+                raise ValueError(f"Unknown rule {rule['rule']} in accumulation plan, known rules are {', '.join(RULES)}")
+
+    return [entry for entry in plan if entry.get("enabled", True)]
+
+
+@contextmanager
+def phase(name: str):
+    """Logs the duration of a phase of the accumulation run."""
+    start = time.perf_counter()
+    yield
+    logging.info(f"Accumulation phase {name} took {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+def load_snapshot() -> MarketSnapshot | None:
+    """Returns the market snapshot of the file in CB0TSNAPSHOT to replay a run with its market data, None to capture a new one."""
+    path = os.getenv("CB0TSNAPSHOT")
+
+    if path and os.getenv("CB0TENV", "DEV") == "PROD":
+        # A replayed run sizes its orders with stale prices, production always captures the current market
+        raise RuntimeError(f"CB0TSNAPSHOT {path} must not be set in the production environment")
+
+    return MarketSnapshot.load(path) if path else None
+
+
+def should_accumulate(asset: Asset, rules: list[dict]) -> bool:
+    """Returns True if all rules of a plan entry apply to the asset."""
+    for rule in rules:
+        params = {key: value for key, value in rule.items() if key != "rule"}
+
+        if not RULES[rule["rule"]](asset, **params):
+            return False
+
+    return True
+
+
+def run_plan(plan: list[dict], snapshot: MarketSnapshot | None = None) -> int:
+    """Captures the market data of all assets of the plan, evaluates their rules and accumulates, returns the number of orders.
+
+    The rules and the order sizes use the same market snapshot, it is written to market_snapshot.json in the data directory.
+    A given snapshot replays an earlier run, its orders are only logged as a dry run.
+    """
+    assets = {entry["asset"]: ASSETS[entry["asset"]]() for entry in plan}
+
+    replay = snapshot is not None
+
+    with phase("prefetch"):
+        if not replay:
+            # One ticker and one asset pair request for all assets, the candles of the assets are loaded concurrently
+            snapshot = MarketSnapshot.capture(list(assets.values()))
+            snapshot.save(data_path("market_snapshot.json"))
+
+        for asset in assets.values():
+            asset.snapshot = snapshot
+
+    with phase("evaluate"):
+        buys = []
+
+        for entry in plan:
+            asset = assets[entry["asset"]]
+
+            try:
+                if should_accumulate(asset, entry.get("rules", [])):
+                    buys.append((asset, entry["euro"]))
+
+            except AssetException as e:
+                logging.error(f"{asset.pair} {e}")
+
+    with phase("orders"):
+        return accumulate_batch(buys, snapshot, dry_run=replay)
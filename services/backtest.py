@@ -0,0 +1,121 @@
+"""Vectorized backtesting of accumulation strategies over daily price history."""
+
+import numpy as np
+import pandas as pd
+from assets.indicators import RSI, SMA
+
+WEEK = 7 * 86400
+
+
+def below_sma(prices: pd.DataFrame, window: int = 125) -> np.ndarray:
+    """Days where the close is below the simple moving average of the daily closes."""
+    close = prices["close"].to_numpy(dtype=np.float64)
+    return close < SMA(window).compute(close)
+
+
+def below_weekly_sma(prices: pd.DataFrame, window: int = 200) -> np.ndarray:
+    """Days where the close is below the weekly SMA, the open week counts with the close of the day like a live weekly candle."""
+    close = prices["close"].to_numpy(dtype=np.float64)
+
+    # Kraken aligns weekly candles to the unix epoch
+    week = pd.DatetimeIndex(prices["time"]).as_unit("s").asi8 // WEEK
+    weeks, first_day = np.unique(week, return_index=True)
+    week_index = np.searchsorted(weeks, week)
+
+    # The close of a completed week is the close of its last day, summed up over the previous window - 1 weeks
+    last_day = np.append(first_day[1:] - 1, len(close) - 1)
+    cumsum = np.insert(np.cumsum(close[last_day]), 0, 0.0)
+    start = week_index - (window - 1)
+
+    sma = np.full(len(close), np.nan)
+    valid = start >= 0
+    sma[valid] = (cumsum[week_index[valid]] - cumsum[start[valid]] + close[valid]) / window
+
+    return close < sma
+
+
+def rsi_below(prices: pd.DataFrame, threshold: float = 35, window: int = 14) -> np.ndarray:
+    """Days where the RSI of the daily closes is below the threshold."""
+    return RSI(window).compute(prices["close"].to_numpy(dtype=np.float64)) < threshold
+
+
+def every_n_days(prices: pd.DataFrame, n: int = 2) -> np.ndarray:
+    """Days where the day of the month is divisible by n, like the cadence of the accumulation timer."""
+    return pd.DatetimeIndex(prices["time"]).day.to_numpy() % n == 0
+
+
+SIGNALS = {
+    "below_sma": below_sma,
+    "below_weekly_sma": below_weekly_sma,
+    "rsi_below": rsi_below,
+    "every_n_days": every_n_days,
+}
+
+
+def signal(prices: pd.DataFrame, rules: list[dict]) -> np.ndarray:
+    """Combines the rules, given as dicts with the rule name and its parameters, to the days where all rules apply."""
+    result = np.ones(len(prices), dtype=bool)
+
+    for rule in rules:
+        params = {key: value for key, value in rule.items() if key != "rule"}
+        result &= SIGNALS[rule["rule"]](prices, **params)
+
+    return result
+
+
+def accelerated_amounts(prices: pd.DataFrame, euro: float) -> np.ndarray:
+    """Euro amount per day scaled by the distance to the all time high so far, like Asset.accelerate."""
+    ath = np.maximum.accumulate(prices["high"].to_numpy(dtype=np.float64))
+    return np.round(ath / prices["close"].to_numpy(dtype=np.float64) * euro, 2)
+
+
+def backtest(prices: pd.DataFrame, buy: np.ndarray, amounts: np.ndarray | float, fee: float = 0.0) -> pd.DataFrame:
+    """Simulates buying the euro amounts at the close of every buy day and returns the daily equity curve."""
+    close = prices["close"].to_numpy(dtype=np.float64)
+    invested = np.where(buy, amounts, 0.0)
+    units = invested * (1 - fee) / close
+
+    total_invested = np.cumsum(invested)
+    total_units = np.cumsum(units)
+    equity = total_units * close
+    peak = np.maximum.accumulate(equity)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        average_cost = np.where(total_units > 0, total_invested / total_units, np.nan)
+        drawdown = np.where(peak > 0, equity / peak - 1, 0.0)
+
+    return pd.DataFrame({
+        "time": prices["time"].to_numpy(),
+        "close": close,
+        "buy": buy,
+        "invested": invested,
+        "units": units,
+        "total_invested": total_invested,
+        "total_units": total_units,
+        "average_cost": average_cost,
+        "equity": equity,
+        "pnl": equity - total_invested,
+        "drawdown": drawdown,
+    })
+
+
+def summarize(curve: pd.DataFrame) -> dict:
+    """Summarizes an equity curve to the key figures of the strategy."""
+    last = curve.iloc[-1]
+    invested = last["total_invested"]
+
+    return {
+        "buys": int(curve["buy"].sum()),
+        "invested": round(float(invested), 2),
+        "units": float(last["total_units"]),
+        "average_cost": round(float(last["average_cost"]), 2) if last["total_units"] > 0 else 0.0,
+        "equity": round(float(last["equity"]), 2),
+        "return_pct": round(float(last["pnl"] / invested * 100), 2) if invested > 0 else 0.0,
+        "max_drawdown_pct": round(float(curve["drawdown"].min() * 100), 2),
+    }
+
+
+def run_strategy(prices: pd.DataFrame, rules: list[dict], euro: float, sizing: str = "fixed", fee: float = 0.0) -> pd.DataFrame:
+    """Backtests a strategy given by its rules, the euro amount per buy and the sizing, either fixed or accelerate."""
+    amounts = accelerated_amounts(prices, euro) if sizing == "accelerate" else euro
+    return backtest(prices, signal(prices, rules), amounts, fee)
@@ -1,82 +1,98 @@
 """Cost basis calculation service."""
 
 import logging
-from decimal import Decimal, getcontext
+from decimal import Decimal, localcontext
 from assets.asset import Asset
 from kraken.exceptions import KrakenUnknownAssetError
+from services.trade_ledger import get_ledger
 from utils.kraken_client import user
+from utils.metrics import measure
 
-# Set decimal precision for financial calculations
-getcontext().prec = 10
+# Decimal precision of the cost basis calculation, set in a local context so other Decimal users keep the default
+PRECISION = 10
 
 
+@measure("cost_basis.calculate_cost_basis")
 def calculate_cost_basis(asset: Asset, amount: float) -> float:
     """Calculates the cost basis for a given asset and amount."""
+    cost_bases = calculate_cost_bases([(asset, amount)])
 
-    # Fetch all trades for the user
-    # 50 is the maximum number of trades to fetch in a single request
-    # therefore we need to increase the offset and repeat the request until all trades are received
-    try:
-        all_trades = {}
-        offset = 0
-
-        while True:
-            trades = user.get_trades_history(ofs=offset)
-
-            if not trades or "trades" not in trades:
-                break
+    if cost_bases is None:
+        return None
 
-            all_trades.update(trades["trades"])
+    return cost_bases[asset.pair]
 
-            if len(trades["trades"]) < 50:
-                break
 
-            offset += 50
+def sync_trades() -> bool:
+    """Brings the local trade ledger up to date, only trades newer than the last stored trade are fetched."""
+    try:
+        get_ledger().sync(user)
+        return True
 
     except KrakenUnknownAssetError as e:
         logging.error(str(e))
+        return False
+
+
+@measure("cost_basis.calculate_cost_bases")
+def calculate_cost_bases(holdings: list[tuple[Asset, float]], sync: bool = True) -> dict[str, float]:
+    """Calculates the cost basis for several assets and amounts with one ledger sync and one pass over all trades."""
+    if sync and not sync_trades():
         return None
 
+    trades_by_pair = get_ledger().get_trades_by_pair({asset.pair for asset, _ in holdings})
+
+    with localcontext(prec=PRECISION):
+        return {asset.pair: _cost_basis(asset.pair, trades_by_pair[asset.pair], amount) for asset, amount in holdings}
+
+
+def _cost_basis(pair: str, trades: dict, amount: float) -> float:
+    """Walks back the trades of one pair from the newest to the oldest until the amount is covered."""
+
     # now we have a complete list of trades for the asset
     # we start now calculating back the cost basis
     amount_counter = Decimal(str(amount))
     cost_basis = Decimal('0.0')
 
+    # The per trade log lines are only written if debug logging is enabled
+    trace = logging.getLogger().isEnabledFor(logging.DEBUG)
+
     # Iterate over all trades to calculate the cost basis
-    logging.info(f"Calculating cost basis for {asset.pair} with amount {amount}")
-    for trade_id, trade in all_trades.items():
+    logging.info(f"Calculating cost basis for {pair} with amount {amount}")
+    for trade_id, trade in trades.items():
 
-        # Check if the trade is for the specified asset pair, skip otherwise
-        if trade["pair"] == asset.pair:
+        trade_vol = Decimal(str(trade["vol"]))
+        trade_cost = Decimal(str(trade["cost"]))
+        trade_fee = Decimal(str(trade["fee"]))
 
-            trade_vol = Decimal(str(trade["vol"]))
-            trade_cost = Decimal(str(trade["cost"]))
-            trade_fee = Decimal(str(trade["fee"]))
+        if trace:
+            logging.debug(f"Processing start: {trade_id} {trade_vol} {trade_cost} {trade_fee} Counter: {amount_counter} Cost Basis: {cost_basis}")
 
-            logging.info(f"Processing start: {trade_id} {trade_vol} {trade_cost} {trade_fee} Counter: {amount_counter} Cost Basis: {cost_basis}")
-            # If the trade is a buy, we subtract the volume from the amount counter
-            if trade["type"] == "buy":
+        # If the trade is a buy, we subtract the volume from the amount counter
+        if trade["type"] == "buy":
 
-                # if the trade is bigger than the amount counter, we need to split the trade
-                # to meet the remaining amount of the amount_counter
-                if amount_counter < trade_vol:
-                    cost_basis += ((trade_cost + trade_fee) * amount_counter) / trade_vol
-                    amount_counter = 0
+            # if the trade is bigger than the amount counter, we need to split the trade
+            # to meet the remaining amount of the amount_counter
+            if amount_counter < trade_vol:
+                cost_basis += ((trade_cost + trade_fee) * amount_counter) / trade_vol
+                amount_counter = 0
 
-                else:
-                    amount_counter -= trade_vol
-                    cost_basis += (trade_cost + trade_fee)
+            else:
+                amount_counter -= trade_vol
+                cost_basis += (trade_cost + trade_fee)
 
-                logging.info(f"Processing   buy: {trade_id} {trade_vol} {trade_cost} {trade_fee} Counter: {amount_counter} Cost Basis: {cost_basis}")
+            if trace:
+                logging.debug(f"Processing   buy: {trade_id} {trade_vol} {trade_cost} {trade_fee} Counter: {amount_counter} Cost Basis: {cost_basis}")
 
-                if amount_counter == 0:
-                    break
+            if amount_counter == 0:
+                break
 
+        elif trade["type"] == "sell":
+            amount_counter += trade_vol
+            cost_basis -= trade_cost
 
-            elif trade["type"] == "sell":
-                amount_counter += trade_vol
-                cost_basis -= trade_cost
-                logging.info(f"Processing  sell: {trade_id} {trade_vol} {trade_cost} {trade_fee} Counter: {amount_counter} Cost Basis: {cost_basis}")
+            if trace:
+                logging.debug(f"Processing  sell: {trade_id} {trade_vol} {trade_cost} {trade_fee} Counter: {amount_counter} Cost Basis: {cost_basis}")
 
     # finally we need to add the trading fees to sell the amount if assets
     # the trading fee for this is 0.4% at Kraken exchange
@@ -0,0 +1,229 @@
+"""Lot accounting of the trade ledger with FIFO, LIFO or average cost matching, updated incrementally and snapshotted to disk."""
+
+import json
+import logging
+import os
+import threading
+from collections import deque
+from collections.abc import Callable
+from decimal import Decimal
+from services.trade_ledger import TradeLedger, get_ledger
+from utils.storage import data_path
+
+METHODS = ("fifo", "lifo", "average")
+
+ZERO = Decimal("0")
+
+
+class LotBook:
+    """Open lots of one pair with the realized result of all sells, the cost of a lot includes its buy fee."""
+
+    def __init__(self, pair: str, method: str = "fifo"):
+        if method not in METHODS:
+            raise ValueError(f"Unknown lot matching method {method}, use one of {', '.join(METHODS)}")
+
+        self.pair = pair
+        self.method = method
+        self.lots = deque()
+        self.volume = ZERO
+        self.cost = ZERO
+        self.realized = ZERO
+        self.unmatched = ZERO
+
+    def buy(self, volume: Decimal, cost: Decimal) -> None:
+        """Opens a lot, with average cost all open volume is kept in a single lot."""
+        if self.method == "average" and self.lots:
+            lot = self.lots[0]
+            lot[0] += volume
+            lot[1] += cost
+        else:
+            self.lots.append([volume, cost])
+
+        self.volume += volume
+        self.cost += cost
+
+    def sell(self, volume: Decimal, proceeds: Decimal) -> None:
+        """Closes the volume against the open lots in matching order and realizes the proceeds minus the cost of the closed volume."""
+        remaining = volume
+        closed_cost = ZERO
+
+        # Every lot is removed at most once, a sell touches the lots it closes and splits at most one lot
+        while remaining > 0 and self.lots:
+            lot = self.lots[-1] if self.method == "lifo" else self.lots[0]
+
+            if lot[0] <= remaining:
+                remaining -= lot[0]
+                closed_cost += lot[1]
+
+                if self.method == "lifo":
+                    self.lots.pop()
+                else:
+                    self.lots.popleft()
+            else:
+                part = lot[1] * remaining / lot[0]
+                lot[0] -= remaining
+                lot[1] -= part
+                closed_cost += part
+                remaining = ZERO
+
+        # Volume sold beyond the open lots was bought before the ledger starts or deposited, it has no known cost
+        self.unmatched += remaining
+        self.volume -= volume - remaining
+        self.cost -= closed_cost
+        self.realized += proceeds - closed_cost
+
+        if not self.lots:
+            self.volume = self.cost = ZERO
+
+    def apply(self, trade: dict) -> None:
+        """Applies a trade of the Kraken trade history."""
+        volume, cost, fee = Decimal(str(trade["vol"])), Decimal(str(trade["cost"])), Decimal(str(trade["fee"]))
+
+        if trade["type"] == "buy":
+            self.buy(volume, cost + fee)
+        elif trade["type"] == "sell":
+            self.sell(volume, cost - fee)
+
+    def average_price(self) -> Decimal:
+        """Returns the average cost of the open volume."""
+        return self.cost / self.volume if self.volume > 0 else ZERO
+
+    def unrealized(self, price: float) -> Decimal:
+        """Returns the result of selling the open volume at the price without fees."""
+        return Decimal(str(price)) * self.volume - self.cost
+
+    def to_dict(self) -> dict:
+        """Returns the state of the book for the snapshot, decimals are stored as strings."""
+        return {
+            "lots": [[str(volume), str(cost)] for volume, cost in self.lots],
+            "volume": str(self.volume),
+            "cost": str(self.cost),
+            "realized": str(self.realized),
+            "unmatched": str(self.unmatched),
+        }
+
+    @classmethod
+    def from_dict(cls, pair: str, method: str, state: dict) -> "LotBook":
+        """Restores a book from its snapshot state."""
+        book = cls(pair, method)
+        book.lots = deque([Decimal(volume), Decimal(cost)] for volume, cost in state["lots"])
+
+        for name in ("volume", "cost", "realized", "unmatched"):
+            setattr(book, name, Decimal(state[name]))
+
+        return book
+
+
+class LotAccounts:
+    """Lot books of all pairs which apply the trades of the ledger once, the state is snapshotted to a JSON file if a path is given."""
+
+    def __init__(self, path: str | None, method: str = "fifo"):
+        if method not in METHODS:
+            raise ValueError(f"Unknown lot matching method {method}, use one of {', '.join(METHODS)}")
+
+        self.path = path
+        self.method = method
+        self.lock = threading.Lock()
+        self.books = {}
+
+        # Trades are applied in time order, the trades at the time of the last applied trade are remembered to skip them next time
+        self.last_time = None
+        self.last_txids = set()
+
+        if path and os.path.exists(path):
+            self._load()
+
+    def _load(self) -> None:
+        """Restores the state of the snapshot file."""
+        with open(self.path, encoding="utf-8") as file:
+            snapshot = json.load(file)
+
+        if snapshot["method"] != self.method:
+            raise ValueError(f"Lot snapshot {self.path} was created with {snapshot['method']} instead of {self.method}")
+
+        self.books = {pair: LotBook.from_dict(pair, self.method, state) for pair, state in snapshot["books"].items()}
+        self.last_time = snapshot["last_time"]
+        self.last_txids = set(snapshot["last_txids"])
+
+    def _save(self) -> None:
+        """Writes the snapshot file, it is replaced atomically so an interrupted write keeps the previous snapshot."""
+        snapshot = {
+            "method": self.method,
+            "last_time": self.last_time,
+            "last_txids": sorted(self.last_txids),
+            "books": {pair: book.to_dict() for pair, book in self.books.items()},
+        }
+
+        with open(f"{self.path}.tmp", "w", encoding="utf-8") as file:
+            json.dump(snapshot, file)
+
+        os.replace(f"{self.path}.tmp", self.path)
+
+    def update(self, ledger: TradeLedger, on_trade: Callable[[LotBook, dict], None] | None = None) -> int:
+        """Applies the trades of the ledger which are newer than the last applied trade and returns their number.
+
+        on_trade is called with the book of the pair after each trade was applied, for example to record the lot states.
+        """
+        with self.lock:
+            trades = [(txid, trade) for txid, trade in ledger.get_trades_since(self.last_time or 0) if txid not in self.last_txids]
+
+            for txid, trade in trades:
+                if self.last_time is None or float(trade["time"]) > self.last_time:
+                    self.last_time = float(trade["time"])
+                    self.last_txids = set()
+
+                self.last_txids.add(txid)
+                book = self.book(trade["pair"])
+                book.apply(trade)
+
+                if on_trade:
+                    on_trade(book, trade)
+
+            if trades and self.path:
+                self._save()
+                logging.info(f"Lot accounts ({self.method}) applied {len(trades)} trades up to {self.last_time}")
+
+        return len(trades)
+
+    def book(self, pair: str) -> LotBook:
+        """Returns the lot book of the pair, an empty book if the pair was never traded."""
+        if pair not in self.books:
+            self.books[pair] = LotBook(pair, self.method)
+
+        return self.books[pair]
+
+    def positions(self, prices: dict[str, float]) -> dict[str, dict]:
+        """Returns volume, cost basis, average price, realized and unrealized result of every pair with a price."""
+        with self.lock:
+            return {
+                pair: {
+                    "volume": float(book.volume),
+                    "cost_basis": round(float(book.cost), 2),
+                    "average_price": round(float(book.average_price()), 2),
+                    "realized_pnl": round(float(book.realized), 2),
+                    "unrealized_pnl": round(float(book.unrealized(prices[pair])), 2),
+                }
+                for pair, book in self.books.items()
+                if pair in prices
+            }
+
+
+_accounts = {}
+_accounts_lock = threading.Lock()
+
+# The balance page shows the realized and unrealized PnL of these accounts, its cost basis column stays with services.cost_basis
+# which subtracts the proceeds of a sell instead of the cost of the closed lots, as the stop loss values are based on it
+
+
+def get_lot_accounts(method: str | None = None) -> LotAccounts:
+    """Returns the lot accounts of the current data directory brought up to date with the trade ledger, the method defaults to CB0TLOTMETHOD."""
+    method = method or os.getenv("CB0TLOTMETHOD", "fifo")
+    path = data_path(f"lots_{method}.json")
+
+    with _accounts_lock:
+        if path not in _accounts:
+            _accounts[path] = LotAccounts(path, method)
+
+    accounts = _accounts[path]
+    accounts.update(get_ledger())
+    return accounts
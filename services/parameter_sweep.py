@@ -0,0 +1,95 @@
+"""Parameter sweep of the accumulation strategy over the backtest engine with a process pool."""
+
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+import pandas as pd
+from services.backtest import SIGNALS, accelerated_amounts, backtest, summarize
+from services.price_history import get_price_history
+
+# Parameters of the accumulation timer: weekly SMA window, optional RSI threshold, euro amount, buy every n-th day
+DEFAULT_GRID = {
+    "sma_window": [50, 100, 150, 200],
+    "rsi_threshold": [None, 30, 35, 40, 50],
+    "euro": [4, 8, 16],
+    "cadence": [1, 2, 3, 7],
+}
+
+# Price data of the worker process, attached once from shared memory
+_shared = {}
+
+
+def _attach(name: str, length: int) -> None:
+    """Initializes a worker process with the price data in the shared memory block."""
+    memory = SharedMemory(name=name)
+    data = np.ndarray((3, length), dtype=np.float64, buffer=memory.buf)
+
+    _shared["memory"] = memory
+    _shared["prices"] = pd.DataFrame({"time": pd.to_datetime(data[0].astype(np.int64), unit="s"), "high": data[1], "close": data[2]})
+    _rule_signal.cache_clear()
+
+
+@lru_cache(maxsize=256)
+def _rule_signal(rule: str, params: tuple) -> np.ndarray:
+    """Returns the signal of a single rule, each rule is evaluated once per worker process."""
+    return SIGNALS[rule](_shared["prices"], **dict(params))
+
+
+def _evaluate(combinations: list[dict]) -> list[dict]:
+    """Backtests a chunk of parameter combinations and returns the parameters with the summary of each backtest."""
+    prices = _shared["prices"]
+    results = []
+
+    for params in combinations:
+        buy = _rule_signal("below_weekly_sma", (("window", params["sma_window"]),)) & _rule_signal("every_n_days", (("n", params["cadence"]),))
+
+        if params["rsi_threshold"] is not None:
+            buy = buy & _rule_signal("rsi_below", (("threshold", params["rsi_threshold"]),))
+
+        curve = backtest(prices, buy, accelerated_amounts(prices, params["euro"]))
+        results.append({**params, **summarize(curve)})
+
+    return results
+
+
+def sweep(prices: pd.DataFrame, grid: dict = None, rank_by: str = "return_pct", max_workers: int | None = None, chunksize: int = 64) -> pd.DataFrame:
+    """Backtests every combination of the parameter grid in parallel and returns the results ranked by the given column."""
+    grid = DEFAULT_GRID if grid is None else grid
+    combinations = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    chunks = [combinations[i:i + chunksize] for i in range(0, len(combinations), chunksize)]
+
+    # The prices are shared with the workers through one shared memory block instead of pickling them for every task
+    data = np.vstack([
+        pd.DatetimeIndex(prices["time"]).as_unit("s").asi8.astype(np.float64),
+        prices["high"].to_numpy(dtype=np.float64),
+        prices["close"].to_numpy(dtype=np.float64),
+    ])
+    memory = SharedMemory(create=True, size=data.nbytes)
+
+    try:
+        np.ndarray(data.shape, dtype=np.float64, buffer=memory.buf)[:] = data
+        workers = max_workers or os.cpu_count()
+
+        logging.info(f"Sweeping {len(combinations)} parameter combinations with {workers} processes")
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(memory.name, len(prices))) as executor:
+            results = [result for chunk in executor.map(_evaluate, chunks) for result in chunk]
+
+    finally:
+        memory.close()
+        memory.unlink()
+
+    return pd.DataFrame(results).sort_values(rank_by, ascending=False, ignore_index=True)
+
+
+def main() -> None:
+    """Sweeps the default grid over the cached Bitcoin history and prints the best combinations."""
+    print(sweep(get_price_history("BTC-USD").load()).head(20).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Daily portfolio history of holdings, value, cost basis and PnL per pair from the trade ledger and the stored daily candles."""
+
+import logging
+import os
+import threading
+import numpy as np
+import pandas as pd
+from services.lots import LotAccounts, LotBook
+from services.trade_ledger import TradeLedger, get_ledger
+from utils.candle_store import get_candle_store
+from utils.result_cache import ResultCache
+
+DAY = 86400
+INTERVAL = 1440
+
+# Columns which are summed over the pairs
+TOTAL_COLUMNS = ["value", "cost_basis", "realized_pnl", "unrealized_pnl", "pnl"]
+
+
+class PortfolioHistory:
+    """Daily history of the traded pairs, no Kraken API is called.
+
+    New ledger trades are applied to the kept lot books and the lot state after every trade is appended to arrays.
+    A new daily candle then only aligns these states with the candle days in one vectorized pass.
+    """
+
+    def __init__(self, ledger: TradeLedger, method: str = "fifo"):
+        self.ledger = ledger
+        self.method = method
+        self.lock = threading.Lock()
+        # In memory lot books which apply each ledger trade once, the states after every trade are recorded while applying
+        self.accounts = LotAccounts(None, method)
+        # The ledger version is the time of its newest trade, None for an empty ledger which has no states
+        self.states_version = None
+        self.states = {}
+        self.series = ResultCache(stale_while_revalidate=False)
+
+    def _trade_states(self, version: float | None) -> dict[str, np.ndarray]:
+        """Returns time, volume, cost basis and realized result after every trade per pair, only new ledger trades are applied."""
+        with self.lock:
+            if self.states_version == version:
+                return self.states
+
+            rows = {}
+
+            def record(book: LotBook, trade: dict) -> None:
+                rows.setdefault(book.pair, []).append((float(trade["time"]), float(book.volume), float(book.cost), float(book.realized)))
+
+            applied = self.accounts.update(self.ledger, record)
+
+            # A new dict is published so callers keep the states they were given, the arrays of unchanged pairs are shared
+            states = dict(self.states)
+            for pair, new_rows in rows.items():
+                new_states = np.array(new_rows, dtype=float)
+                states[pair] = np.concatenate((states[pair], new_states)) if pair in states else new_states
+
+            self.states = states
+            self.states_version = version
+            logging.info(f"Portfolio history ({self.method}) applied {applied} trades of {len(rows)} pairs up to {version}")
+
+            return self.states
+
+    def _version(self, pair: str, ledger_version: float | None) -> tuple:
+        """Returns the data version of a pair history, the ledger version with the start and close of the newest candle."""
+        newest = get_candle_store().get(pair, INTERVAL, length=1)
+        return (ledger_version, newest[0][0], newest[0][4]) if newest else (ledger_version, None, None)
+
+    def pair_history(self, pair: str) -> pd.DataFrame:
+        """Returns the daily close, holdings, value, cost basis and PnL of the pair indexed by the candle date."""
+        ledger_version = self.ledger.last_time()
+        version = self._version(pair, ledger_version)
+
+        def compute():
+            return version, self._pair_history(pair, self._trade_states(ledger_version).get(pair))
+
+        return self.series.get(pair, version, compute)
+
+    def _pair_history(self, pair: str, states: np.ndarray | None) -> pd.DataFrame:
+        """Aligns the lot states with the stored daily candles, a day closes with all trades made before the next day starts."""
+        candles = np.array(get_candle_store().get(pair, INTERVAL), dtype=float).reshape(-1, 8)
+        times, close = candles[:, 0], candles[:, 4]
+
+        if states is None:
+            states = np.empty((0, 4))
+
+        # Row 0 is the state before the first trade, row n the state after n trades
+        applied = np.searchsorted(states[:, 0], times + DAY, side="left")
+        volume, cost, realized = (np.concatenate(([0.0], states[:, column]))[applied] for column in (1, 2, 3))
+
+        value = volume * close
+        unrealized = value - cost
+
+        frame = pd.DataFrame(
+            {
+                "close": close,
+                "holdings": volume,
+                "value": value,
+                "cost_basis": cost,
+                "realized_pnl": realized,
+                "unrealized_pnl": unrealized,
+                "pnl": realized + unrealized,
+            },
+            index=pd.to_datetime(times, unit="s"),
+        )
+        frame.index.name = "date"
+        return frame
+
+    def total(self, pairs: list[str]) -> pd.DataFrame:
+        """Returns the summed value, cost basis and PnL of the pairs on the days for which all of them have stored candles.
+
+        Pairs without any stored daily candle are left out of the total, so they do not hide the history of the others.
+        """
+        ledger_version = self.ledger.last_time()
+        version = tuple(self._version(pair, ledger_version) for pair in pairs)
+
+        def compute():
+            charted = [pair for pair, (_, start, _) in zip(pairs, version) if start is not None]
+
+            if len(charted) < len(pairs):
+                logging.warning(f"No daily candles stored for {', '.join(sorted(set(pairs) - set(charted)))}, left out of the portfolio total")
+
+            frames = [self.pair_history(pair)[TOTAL_COLUMNS] for pair in charted]
+
+            if not frames:
+                return version, pd.DataFrame(columns=TOTAL_COLUMNS)
+
+            dates = frames[0].index
+            for frame in frames[1:]:
+                dates = dates.intersection(frame.index)
+
+            return version, pd.DataFrame(sum(frame.loc[dates].to_numpy() for frame in frames), index=dates, columns=TOTAL_COLUMNS)
+
+        return self.series.get(("total", *pairs), version, compute)
+
+
+_histories = {}
+_histories_lock = threading.Lock()
+
+
+def get_portfolio_history(method: str | None = None) -> PortfolioHistory:
+    """Returns the portfolio history of the current data directory, the method defaults to CB0TLOTMETHOD."""
+    method = method or os.getenv("CB0TLOTMETHOD", "fifo")
+    ledger = get_ledger()
+    key = (ledger.path, method)
+
+    with _histories_lock:
+        if key not in _histories:
+            _histories[key] = PortfolioHistory(ledger, method)
+
+    return _histories[key]
@@ -0,0 +1,212 @@
+"""Daily price history served from a local columnar cache which is refreshed incrementally from a provider."""
+
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
+from utils.replay import cassette_key, get_cassette
+from utils.storage import data_path
+
+# Columns of the cache, every column is stored as raw binary file which is read with a memory map
+COLUMNS = {
+    "time": np.int64,
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.float64,
+}
+
+
+class HistoryProvider(ABC):
+    """Source of daily price history with the columns of the cache, time as unix seconds of the day."""
+
+    @abstractmethod
+    def fetch(self, symbol: str, start: int | None = None) -> pd.DataFrame:
+        """Returns the daily prices of the symbol from the start day on, the complete history if no start is given."""
+
+
+class YFinanceProvider(HistoryProvider):
+    """Daily price history from Yahoo Finance."""
+
+    def fetch(self, symbol: str, start: int | None = None) -> pd.DataFrame:
+        cassette = get_cassette()
+
+        if cassette is not None:
+            columns = cassette.call(cassette_key("yfinance", "history", (symbol,), {"start": start}), lambda: self._fetch(symbol, start).to_dict("list"))
+            return pd.DataFrame(columns).astype(COLUMNS)
+
+        return self._fetch(symbol, start)
+
+    def _fetch(self, symbol: str, start: int | None) -> pd.DataFrame:
+        """Downloads the daily prices from Yahoo Finance."""
+        import yfinance as yf  # pylint: disable=import-outside-toplevel
+
+        ticker = yf.Ticker(symbol)
+
+        if start is None:
+            df = ticker.history(period="max", interval="1d")
+        else:
+            df = ticker.history(start=pd.Timestamp(start, unit="s").strftime("%Y-%m-%d"), interval="1d")
+
+        return pd.DataFrame({
+            "time": pd.DatetimeIndex(df.index).as_unit("s").asi8,
+            "open": df["Open"].to_numpy(),
+            "high": df["High"].to_numpy(),
+            "low": df["Low"].to_numpy(),
+            "close": df["Close"].to_numpy(),
+            "volume": df["Volume"].to_numpy(),
+        })
+
+
+class CsvProvider(HistoryProvider):
+    """Daily price history from a CSV file with a date column and the price columns, used for offline runs and tests."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def fetch(self, symbol: str, start: int | None = None) -> pd.DataFrame:
+        df = pd.read_csv(self.path)
+        df["time"] = pd.DatetimeIndex(pd.to_datetime(df.pop("date"), utc=True)).as_unit("s").asi8
+        df = df[list(COLUMNS)]
+
+        return df if start is None else df[df["time"] >= start].reset_index(drop=True)
+
+
+class PriceHistory:
+    """Local columnar cache of the daily price history of one symbol."""
+
+    def __init__(self, symbol: str, provider: HistoryProvider, directory: str, max_age: float = 3600, retry_after: float = 300):
+        self.symbol = symbol
+        self.provider = provider
+        self.directory = directory
+        self.max_age = max_age
+        self.retry_after = retry_after
+        # Time of the last failed refresh, an outdated cache is not refreshed again before the retry interval passed
+        self.failed_refresh = 0.0
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, column: str) -> str:
+        """Returns the path of the raw binary file of a column."""
+        return os.path.join(self.directory, f"{column}.bin")
+
+    def _read(self) -> dict[str, np.ndarray]:
+        """Maps the columns of the cache read-only into memory, all columns are cut to the length of the shortest one.
+
+        A refresh replaces the files, so open maps keep the previous days and stay valid in other processes as well.
+        """
+        length = min(os.path.getsize(self._path(c)) // np.dtype(d).itemsize if os.path.exists(self._path(c)) else 0 for c, d in COLUMNS.items())
+
+        if length == 0:
+            return {column: np.array([], dtype=dtype) for column, dtype in COLUMNS.items()}
+
+        return {column: np.memmap(self._path(column), dtype=dtype, mode="r", shape=(length,)) for column, dtype in COLUMNS.items()}
+
+    def _write(self, keep: int, df: pd.DataFrame) -> None:
+        """Keeps the first rows of the cache and appends the rows of the DataFrame to every column file.
+
+        Every column is written to a temporary file which replaces the column atomically, a file mapped by a reader is never changed.
+        """
+        # The time column is replaced last, an interrupted write leaves it shorter and the incomplete rows are ignored
+        for column in sorted(COLUMNS, key=lambda c: c == "time"):
+            path = self._path(column)
+            kept = b""
+
+            if keep and os.path.exists(path):
+                with open(path, "rb") as file:
+                    kept = file.read(keep * np.dtype(COLUMNS[column]).itemsize)
+
+            # Workers of other processes may write the same cache, the temporary file is unique per process
+            with open(f"{path}.{os.getpid()}.tmp", "wb") as file:
+                file.write(kept)
+                file.write(df[column].to_numpy(dtype=COLUMNS[column]).tobytes())
+
+            os.replace(f"{path}.{os.getpid()}.tmp", path)
+
+        # The modification time of the time column marks the last refresh
+        os.utime(self._path("time"))
+
+    def last_refresh(self) -> float:
+        """Returns the time of the last refresh or 0 if the cache is empty."""
+        return os.path.getmtime(self._path("time")) if os.path.exists(self._path("time")) else 0.0
+
+    def needs_refresh(self) -> bool:
+        """Returns True if the cache is older than the maximum age and no refresh failed within the retry interval."""
+        now = time.time()
+        return now - self.last_refresh() > self.max_age and now - self.failed_refresh > min(self.retry_after, self.max_age)
+
+    def refresh(self) -> int:
+        """Fetches the days since the last stored day, which is replaced as it may have been incomplete, and returns the number of received days."""
+        with self.lock:
+            times = self._read()["time"]
+            start = int(times[-1]) if len(times) else None
+
+            try:
+                df = self.provider.fetch(self.symbol, start)
+
+            except Exception:
+                self.failed_refresh = time.time()
+                raise
+
+            keep = len(times) if len(df) == 0 else int(np.searchsorted(times, df["time"].iloc[0]))
+            self._write(keep, df)
+
+        logging.info(f"Price history of {self.symbol} received {len(df)} days since {start}")
+        return len(df)
+
+    def seed(self, provider: HistoryProvider) -> None:
+        """Replaces the cache with the complete history of another provider, for example a CSV fixture."""
+        with self.lock:
+            self._write(0, provider.fetch(self.symbol))
+
+    def load(self, length: int | None = None) -> pd.DataFrame:
+        """Returns the latest days of the history from the cache, the cache is refreshed first if it is older than the maximum age.
+
+        If the refresh fails the stored days are served, only an empty cache raises the error.
+        """
+        if self.needs_refresh():
+            try:
+                self.refresh()
+
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                if self.version() == 0:
+                    raise
+
+                logging.error(f"Refreshing the price history of {self.symbol} failed, serving the stored days: {str(e).replace(chr(10), ' ')}")
+
+        # The slices are copied out of the maps before the lock is released
+        with self.lock:
+            columns = self._read()
+            start = 0 if length is None else max(0, len(columns["time"]) - length)
+            df = pd.DataFrame({column: np.array(values[start:]) for column, values in columns.items()})
+
+        df["time"] = pd.to_datetime(df["time"], unit="s")
+        return df
+
+    def version(self) -> int:
+        """Returns the unix time of the newest stored day, it changes whenever a new day is added to the history."""
+        with self.lock:
+            times = self._read()["time"]
+            return int(times[-1]) if len(times) else 0
+
+
+_histories = {}
+
+
+def get_price_history(symbol: str) -> PriceHistory:
+    """Returns the price history of the symbol, from the CSV file in CB0THISTORYCSV if set and Yahoo Finance otherwise."""
+    csv_path = os.getenv("CB0THISTORYCSV")
+    directory = data_path(os.path.join("history", symbol))
+    key = (directory, csv_path)
+
+    if key not in _histories:
+        provider = CsvProvider(csv_path) if csv_path else YFinanceProvider()
+        _histories[key] = PriceHistory(
+            symbol, provider, directory, float(os.getenv("CB0THISTORYTTL", "3600")), float(os.getenv("CB0THISTORYRETRY", "300"))
+        )
+
+    return _histories[key]
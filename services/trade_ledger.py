@@ -0,0 +1,126 @@
+"""Persistent local trade ledger that mirrors the Kraken trade history."""
+
+import json
+import logging
+import math
+import sqlite3
+import threading
+from utils.concurrency import private_call
+from utils.storage import data_path
+
+# 50 is the maximum number of trades Kraken returns in a single request
+PAGE_SIZE = 50
+
+
+class TradeLedger:
+    """SQLite backed copy of the trade history which is synchronised incrementally from Kraken."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+
+        with self.lock, self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS trades (txid TEXT PRIMARY KEY, pair TEXT NOT NULL, time REAL NOT NULL, type TEXT NOT NULL, data TEXT NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS trades_pair_time ON trades (pair, time)")
+
+    def last_time(self) -> float | None:
+        """Returns the timestamp of the newest stored trade or None if the ledger is empty."""
+        with self.lock:
+            row = self.connection.execute("SELECT MAX(time) FROM trades").fetchone()
+
+        return row[0]
+
+    def add(self, trades: dict) -> None:
+        """Stores the given trades, trades which are already known are ignored."""
+        rows = [
+            (trade_id, trade["pair"], float(trade.get("time", 0)), trade["type"], json.dumps(trade))
+            for trade_id, trade in trades.items()
+        ]
+
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT OR IGNORE INTO trades (txid, pair, time, type, data) VALUES (?, ?, ?, ?, ?)", rows)
+
+    def sync(self, user) -> int:
+        """Fetches the trades newer than the latest stored trade from Kraken and returns the number of received trades."""
+        last_time = self.last_time()
+
+        # Kraken returns the newest trades first, the start timestamp is rounded down,
+        # trades received twice are ignored by the primary key
+        def fetch_page(offset: int, end: int | None = None) -> dict:
+            """Fetches one page of the trades newer than the latest stored trade and not newer than the end."""
+            params = {"ofs": offset} if end is None else {"end": end, "ofs": offset}
+
+            if last_time is None:
+                return private_call(user.get_trades_history, cost=2, **params)
+
+            return private_call(user.get_trades_history, cost=2, start=int(last_time), **params)
+
+        trades = fetch_page(0)
+        pages = [trades]
+
+        # Signed requests are sent one at a time, the remaining pages of the total count are fetched in order.
+        # They end at the newest trade of the first page, a trade executed meanwhile would shift the offsets past a trade
+        if trades and "trades" in trades and len(trades["trades"]) == PAGE_SIZE:
+            end = math.ceil(max(float(trade["time"]) for trade in trades["trades"].values()))
+            pages += [fetch_page(offset, end) for offset in range(PAGE_SIZE, int(trades["count"]), PAGE_SIZE)]
+
+        new_trades = {}
+
+        for page in pages:
+            if page and "trades" in page:
+                new_trades.update(page["trades"])
+
+        self.add(new_trades)
+        logging.info(f"Trade ledger received {len(new_trades)} trades since {last_time}")
+
+        return len(new_trades)
+
+    def get_trades(self, pair: str | None = None) -> dict:
+        """Returns the stored trades, optionally filtered by pair, ordered from newest to oldest like the Kraken API."""
+        with self.lock:
+            if pair is None:
+                rows = self.connection.execute("SELECT txid, data FROM trades ORDER BY time DESC, rowid ASC").fetchall()
+            else:
+                rows = self.connection.execute(
+                    "SELECT txid, data FROM trades WHERE pair = ? ORDER BY time DESC, rowid ASC", (pair,)
+                ).fetchall()
+
+        return {trade_id: json.loads(data) for trade_id, data in rows}
+
+    def get_trades_since(self, since: float) -> list[tuple[str, dict]]:
+        """Returns the stored trades from the given time on, ordered from oldest to newest."""
+        with self.lock:
+            rows = self.connection.execute("SELECT txid, data FROM trades WHERE time >= ? ORDER BY time ASC, rowid ASC", (since,)).fetchall()
+
+        return [(trade_id, json.loads(data)) for trade_id, data in rows]
+
+    def get_trades_by_pair(self, pairs: set[str]) -> dict[str, dict]:
+        """Returns the trades of the given pairs grouped by pair in a single pass, each ordered from newest to oldest."""
+        trades_by_pair = {pair: {} for pair in pairs}
+
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT txid, pair, data FROM trades WHERE pair IN ({', '.join('?' for _ in pairs)}) ORDER BY time DESC, rowid ASC",
+                tuple(pairs),
+            ).fetchall()
+
+        for trade_id, pair, data in rows:
+            trades_by_pair[pair][trade_id] = json.loads(data)
+
+        return trades_by_pair
+
+
+_ledgers = {}
+
+
+def get_ledger() -> TradeLedger:
+    """Returns the trade ledger of the current data directory, it is opened once per process."""
+    path = data_path("trades.sqlite")
+
+    if path not in _ledgers:
+        _ledgers[path] = TradeLedger(path)
+
+    return _ledgers[path]
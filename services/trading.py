@@ -1,41 +1,79 @@
 """Trading and accumulation service."""
 import os
 import logging
-from kraken.spot import Market
-from assets.asset import Asset
+from assets.asset import Asset, get_asset_prices
+from assets.market_snapshot import MarketSnapshot
+from utils import market_data
+from utils.concurrency import trading_call
 from utils.kraken_client import trade
+from utils.metrics import measure
 
 
-def accumulate(asset: Asset, euro: float) -> int:
-    """Accumulates a specified cryptocurrency by adjusting volume based on distance to ATH."""
+def prepare_order(asset: Asset, euro: float, price: float, limits: dict) -> dict:
+    """Returns the market buy order of the accelerated euro amount at the price, the volume is raised to the order minimum of the pair."""
+    accelerated_euro = asset.accelerate(euro, price)
+    volume = round(accelerated_euro / price, limits["lot_decimals"])
 
-    try:
+    if volume < limits["ordermin"]:
+        logging.info(
+            f"{asset.pair} Volume {volume} is below minimum required {limits['ordermin']}, increasing volume."
+        )
+        volume = limits["ordermin"]
 
-        accelerated_euro = asset.accelerate(euro)
-        volume = round(accelerated_euro / asset.get_asset_price(), 8)
+    logging.info(f"{asset.pair} Accumulating {volume} with {accelerated_euro} EUR")
+    return {"ordertype": "market", "pair": asset.pair, "side": "buy", "volume": volume}
 
-        asset_pair = Market().get_asset_pairs(asset.pair)
-        ordermin = float(asset_pair[asset.pair]["ordermin"])
 
-        if volume < ordermin:
-            logging.info(
-                f"{asset.pair} Volume {volume} is below minimum required {ordermin}, increasing volume."
-            )
-            volume = ordermin
+@measure("trading.accumulate_batch")
+def accumulate_batch(orders: list[tuple[Asset, float]], snapshot: MarketSnapshot | None = None, dry_run: bool = False) -> int:
+    """Accumulates several cryptocurrencies in one pass with one price snapshot and returns the number of created orders.
 
-        logging.info(f"{asset.pair} Accumulating {volume} with {accelerated_euro} EUR")
+    With a market snapshot the orders are sized with its prices and pair metadata, which the rules were evaluated with.
+    A dry run only logs the sized orders, no order is sent to Kraken in any environment.
+    """
+    if not orders:
+        return 0
 
-        env = os.getenv("CB0TENV", "DEV")
-        if env != "PROD":
-            raise RuntimeError(f"Not in production environment: {env}")
+    if snapshot is None:
+        try:
+            # One ticker and one asset pair request for all orders, every order is sized with the same price snapshot
+            assets = [asset for asset, _ in orders]
+            prices = get_asset_prices(assets)
+            limits = market_data.get_pair_metadata(list(dict.fromkeys(asset.pair for asset in assets)))
 
-        transaction = trade.create_order(
-            ordertype="market", pair=asset.pair, side="buy", volume=volume
-        )
+        except Exception as e:
+            logging.error(f"{', '.join(asset.pair for asset, _ in orders)} {str(e).replace(chr(10), ' ')}")
+            return 0
 
-        logging.info(f"{asset.pair} Order created: {transaction}")
-        return 1
+    created = 0
 
-    except Exception as e:
-        logging.error(f"{asset.pair} {str(e).replace(chr(10), ' ')}")
-        return 0
+    for asset, euro in orders:
+        try:
+            if snapshot is None:
+                order = prepare_order(asset, euro, prices[asset.pair], limits[asset.pair])
+            else:
+                order = prepare_order(asset, euro, snapshot.price(asset.pair), snapshot.limits(asset.pair))
+
+            if dry_run:
+                logging.info(f"{asset.pair} Dry run, order not created: {order}")
+                continue
+
+            env = os.getenv("CB0TENV", "DEV")
+            if env != "PROD":
+                raise RuntimeError(f"Not in production environment: {env}")
+
+            transaction = trading_call(trade.create_order, **order)
+
+            logging.info(f"{asset.pair} Order created: {transaction}")
+            created += 1
+
+        except Exception as e:
+            logging.error(f"{asset.pair} {str(e).replace(chr(10), ' ')}")
+
+    return created
+
+
+@measure("trading.accumulate")
+def accumulate(asset: Asset, euro: float, snapshot: MarketSnapshot | None = None) -> int:
+    """Accumulates a specified cryptocurrency by adjusting volume based on distance to ATH."""
+    return accumulate_batch([(asset, euro)], snapshot)
@@ -0,0 +1,34 @@
+"""Shared pytest fixtures."""
+
+import os
+import pytest
+from assets import indicators
+from utils import concurrency, market_data
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Points the local data directory for ledgers and caches to a temporary directory per test."""
+    monkeypatch.setenv("CB0TDATA", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    """Starts every test with empty market data caches and without memoized indicators."""
+    market_data.clear_caches()
+    indicators.clear_memo()
+
+
+@pytest.fixture(autouse=True)
+def unlimited_scheduler(monkeypatch):
+    """Replaces the Kraken call scheduler so mocked calls are never throttled or delayed by retries."""
+    counters = {endpoint: concurrency.CallCounter(limit=float("inf"), decay=1) for endpoint in ("public", "private", "trading")}
+    monkeypatch.setattr(concurrency, "scheduler", concurrency.Scheduler(counters, retries=3, backoff=0))
+
+
+@pytest.fixture
+def kraken_cassette(monkeypatch):
+    """Replays the Kraken responses of the synthesized cassette instead of calling api.kraken.com."""
+    monkeypatch.setenv("CB0TCASSETTE", os.path.join(os.path.dirname(__file__), "fixtures", "kraken_cassette.json"))
+    monkeypatch.setenv("CB0TCASSETTEMODE", "replay")
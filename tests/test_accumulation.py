@@ -0,0 +1,72 @@
+"""Tests for the accumulation plan runner."""
+
+import json
+from unittest.mock import Mock, patch
+import pytest
+from assets.asset import Asset, AssetException
+from assets.market_snapshot import MarketSnapshot
+from services import accumulation
+
+
+def _asset(pair: str, below_sma: bool) -> Mock:
+    """Creates a mock asset whose weekly SMA check returns the given value."""
+    asset = Mock(spec=Asset)
+    asset.pair = pair
+    asset.below_Weekly_SMA.return_value = below_sma
+    return asset
+
+
+def test_load_plan_returns_enabled_entries(monkeypatch):
+    """Test that disabled entries are skipped and unknown assets are rejected."""
+    assert [entry["asset"] for entry in accumulation.load_plan()] == ["BTCEUR"]
+
+    monkeypatch.setenv("CB0TPLAN", json.dumps([{"asset": "DOGEEUR", "rules": [], "euro": 1}]))
+    with pytest.raises(ValueError):
+        accumulation.load_plan()
+
+
+@patch("services.accumulation.accumulate_batch", return_value=1)
+@patch("services.accumulation.MarketSnapshot.capture")
+def test_run_plan_prefetches_evaluates_and_orders(mock_capture, mock_accumulate):
+    """Test that one market snapshot is captured for all assets and only assets whose rules apply are accumulated with it."""
+    btc, eth, sol = _asset("XXBTZEUR", True), _asset("XETHZEUR", False), _asset("SOLEUR", True)
+    sol.below_Weekly_SMA.side_effect = AssetException("no data")
+    plan = [
+        {"asset": "BTCEUR", "rules": [{"rule": "below_weekly_sma", "window": 200}], "euro": 8},
+        {"asset": "ETHEUR", "rules": [{"rule": "below_weekly_sma", "window": 200}], "euro": 4},
+        {"asset": "SOLEUR", "rules": [{"rule": "below_weekly_sma", "window": 50}], "euro": 4},
+    ]
+
+    with patch.dict(accumulation.ASSETS, {"BTCEUR": lambda: btc, "ETHEUR": lambda: eth, "SOLEUR": lambda: sol}):
+        assert accumulation.run_plan(plan) == 1
+
+    snapshot = mock_capture.return_value
+    mock_capture.assert_called_once_with([btc, eth, sol])
+    snapshot.save.assert_called_once()
+    assert btc.snapshot is snapshot and sol.snapshot is snapshot
+    btc.below_Weekly_SMA.assert_called_once_with(200)
+    mock_accumulate.assert_called_once_with([(btc, 8)], snapshot, dry_run=False)
+
+
+@patch("services.trading.trade")
+def test_replayed_snapshot_never_creates_orders(mock_trade, monkeypatch, tmp_path):
+    """Test that a run with a loaded snapshot is a dry run and that a snapshot is refused in production."""
+    limits = {"ordermin": 0.0001, "lot_decimals": 8, "pair_decimals": 1, "tick_size": 0.1}
+    snapshot = MarketSnapshot(0, {"XXBTZEUR": {"c": ["50000.0", "1"]}}, {}, {"XXBTZEUR": limits})
+    snapshot.save(str(tmp_path / "snapshot.json"))
+    monkeypatch.setenv("CB0TSNAPSHOT", str(tmp_path / "snapshot.json"))
+    btc = _asset("XXBTZEUR", True)
+    btc.accelerate.return_value = 10
+    plan = [{"asset": "BTCEUR", "rules": [{"rule": "below_weekly_sma", "window": 200}], "euro": 8}]
+
+    with patch.dict(accumulation.ASSETS, {"BTCEUR": lambda: btc}):
+        assert accumulation.run_plan(plan, accumulation.load_snapshot()) == 0
+
+        monkeypatch.setenv("CB0TENV", "PROD")
+        assert accumulation.run_plan(plan, snapshot) == 0
+
+        with pytest.raises(RuntimeError):
+            accumulation.load_snapshot()
+
+    btc.accelerate.assert_called_with(8, 50000.0)
+    mock_trade.create_order.assert_not_called()
@@ -1,7 +1,11 @@
 """ imports """
+import pytest
 from assets.asset_pairs import *  # pylint: disable=wildcard-import,unused-wildcard-import
 from assets.asset import Asset
 
+# The Kraken responses are replayed from the cassette in tests/fixtures
+pytestmark = pytest.mark.usefixtures("kraken_cassette")
+
 btcusd = BTCUSD()
 
 def print_dataframe(test_name, asset):
@@ -0,0 +1,58 @@
+"""Tests for the vectorized backtest engine."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from services import backtest
+
+
+@pytest.fixture
+def prices():
+    """Two years of daily prices as random walk starting on a Monday."""
+    close = np.cumsum(np.random.default_rng(3).normal(0, 50, 730)) + 30000
+    return pd.DataFrame({"time": pd.date_range("2023-01-02", periods=730, freq="D"), "high": close * 1.01, "close": close})
+
+
+def test_below_weekly_sma_matches_weekly_candles(prices):
+    """Test that the weekly SMA of every day equals the SMA over the weekly candles with the day as open candle."""
+    signal = backtest.below_weekly_sma(prices, window=10)
+    week = pd.DatetimeIndex(prices["time"]).as_unit("s").asi8 // backtest.WEEK
+
+    for day in (69, 100, 400, 729):
+        weekly_closes = prices["close"][: day + 1].groupby(week[: day + 1]).last().to_numpy()
+        sma = weekly_closes[-10:].mean()
+        assert signal[day] == (prices["close"][day] < sma)
+
+    # the data starts on a Monday, the first weekly candle starting on a Thursday is complete after 3 days
+    assert not signal[:59].any()
+
+
+def test_signal_combines_rules(prices):
+    """Test that all rules have to apply for a buy signal."""
+    rules = [{"rule": "below_sma", "window": 50}, {"rule": "every_n_days", "n": 2}]
+    expected = backtest.below_sma(prices, 50) & (prices["time"].dt.day.to_numpy() % 2 == 0)
+
+    assert np.array_equal(backtest.signal(prices, rules), expected)
+    assert backtest.signal(prices, []).all()
+
+
+def test_backtest_accumulates_units_and_cost():
+    """Test units, average cost, equity and drawdown of a small fixed amount backtest."""
+    prices = pd.DataFrame({"time": pd.date_range("2024-01-01", periods=4, freq="D"), "high": [100.0, 50.0, 25.0, 50.0], "close": [100.0, 50.0, 25.0, 50.0]})
+    curve = backtest.backtest(prices, np.array([True, True, False, True]), 100.0)
+    summary = backtest.summarize(curve)
+
+    assert curve["total_units"].tolist() == [1.0, 3.0, 3.0, 5.0]
+    assert summary["invested"] == 300.0
+    assert summary["average_cost"] == 60.0
+    assert summary["equity"] == 250.0
+    assert summary["max_drawdown_pct"] == -50.0
+
+
+def test_accelerated_amounts_scale_with_ath_distance(prices):
+    """Test that the accelerated amounts grow with the distance to the all time high like Asset.accelerate."""
+    amounts = backtest.accelerated_amounts(prices, 10)
+    ath = prices["high"].cummax()
+
+    assert amounts[-1] == round(ath.iloc[-1] / prices["close"].iloc[-1] * 10, 2)
+    assert (amounts >= 9.9).all()
@@ -3,7 +3,9 @@
 import os
 import pytest
 import azure.functions as func
+from routes import balance
 from routes.balance import get_balance
+from services.trade_ledger import get_ledger
 
 
 @pytest.mark.skipif(not os.getenv("KRAKENAPIKEY") or not os.getenv("KRAKENAPISECRET"), reason="Kraken API credentials not set")
@@ -16,3 +18,26 @@ def test_get_balance():
     assert response.status_code == 200
     assert response.mimetype == "text/html"
     assert len(response.get_body()) > 0
+
+
+def test_portfolio_series_is_empty_when_the_history_fails(monkeypatch):
+    """Test that a failing portfolio history leaves out the chart instead of failing the balance page."""
+    def failing_history():
+        raise ValueError("broken candles")
+
+    monkeypatch.setattr(balance, "get_portfolio_history", failing_history)
+
+    assert balance._portfolio_series(["XXBTZEUR"]) == ""  # pylint: disable=protected-access
+
+
+def test_lot_positions_read_the_lot_accounts():
+    """Test that the lot accounting section shows the realized and unrealized PnL of the priced pairs."""
+    get_ledger().add({
+        "T1": {"pair": "XXBTZEUR", "time": 1, "type": "buy", "vol": "2.0", "cost": "200", "fee": "0"},
+        "T2": {"pair": "XXBTZEUR", "time": 2, "type": "sell", "vol": "1.0", "cost": "150", "fee": "0"},
+        "T3": {"pair": "SOLEUR", "time": 3, "type": "buy", "vol": "1.0", "cost": "10", "fee": "0"},
+    })
+
+    positions = balance._lot_positions({"XXBTZEUR": 120.0})  # pylint: disable=protected-access
+
+    assert positions == {"XXBTZEUR": {"volume": 1.0, "cost_basis": 100.0, "average_price": 100.0, "realized_pnl": 50.0, "unrealized_pnl": 20.0}}
@@ -0,0 +1,66 @@
+"""Tests for the local OHLC candle store."""
+
+import time
+from unittest.mock import patch
+from assets.asset import Asset
+from utils.candle_store import CandleStore
+
+DAY = 86400
+
+
+def _candles(start: int, count: int) -> list:
+    """Creates daily Kraken OHLC rows starting at the given timestamp."""
+    return [[start + i * DAY, "1.0", "2.0", "0.5", str(1.0 + i), "1.2", "10.0", 5] for i in range(count)]
+
+
+def test_update_fetches_only_new_candles(data_dir):
+    """Test that the first update loads the full window and later updates request candles since the newest stored one."""
+    store = CandleStore(str(data_dir / "candles.sqlite"))
+    start = int(time.time()) // DAY * DAY - 9 * DAY
+    requests = []
+
+    def fetch(since: float) -> list:
+        """Returns the fake candles since the timestamp."""
+        requests.append(since)
+        return [c for c in _candles(start, 10) if c[0] > since]
+
+    assert store.update("XXBTZEUR", 1440, 10, fetch) == 10
+    assert store.update("XXBTZEUR", 1440, 10, fetch) == 1
+    assert requests[1] == start + 9 * DAY - 1
+
+    candles = store.get("XXBTZEUR", 1440, 3)
+    assert [c[0] for c in candles] == [start + 7 * DAY, start + 8 * DAY, start + 9 * DAY]
+    assert candles[-1][4] == 10.0
+
+
+def test_store_keeps_history_beyond_kraken_window(data_dir):
+    """Test that all stored candles are kept and served, not only the latest Kraken window."""
+    store = CandleStore(str(data_dir / "candles.sqlite"))
+    start = int(time.time()) // DAY * DAY - 999 * DAY
+    store.add("XXBTZEUR", 1440, _candles(start, 1000))
+
+    assert store.update("XXBTZEUR", 1440, 1000, lambda since: []) == 0
+    assert len(store.get("XXBTZEUR", 1440)) == 1000
+    assert len(store.get("XXBTZEUR", 10080)) == 0
+
+
+def test_update_reloads_series_with_gap(data_dir):
+    """Test that a series which can not be continued without a gap is reloaded."""
+    store = CandleStore(str(data_dir / "candles.sqlite"))
+    store.add("XXBTZEUR", 1440, _candles(0, 5))
+    start = int(time.time()) // DAY * DAY - 1 * DAY
+
+    store.update("XXBTZEUR", 1440, 720, lambda since: _candles(start, 2))
+
+    assert [c[0] for c in store.get("XXBTZEUR", 1440)] == [start, start + DAY]
+
+
+@patch("assets.asset.market_data.get_ohlc")
+def test_asset_reads_candles_from_store(mock_get_ohlc):
+    """Test that a second asset instance only requests the candles since the newest stored candle."""
+    start = int(time.time()) // DAY * DAY - 719 * DAY
+    mock_get_ohlc.side_effect = lambda pair, interval, since: {pair: [c for c in _candles(start, 720) if c[0] > since], "last": 0}
+
+    assert len(Asset("XXBTZEUR").get_df_1d()) == 720
+    assert len(Asset("XXBTZEUR").get_df_1d()) == 720
+    assert mock_get_ohlc.call_args_list[1].args[2] == start + 719 * DAY - 1
@@ -0,0 +1,123 @@
+"""Tests for the concurrent request helpers."""
+
+import threading
+from functools import partial
+from unittest.mock import Mock, patch
+import pytest
+from kraken.exceptions import KrakenApiLimitExceededError
+from utils.concurrency import CallCounter, Scheduler, fan_out
+
+
+def test_fan_out_runs_calls_concurrently():
+    """Test that all calls run at the same time and their results are returned by key."""
+    barrier = threading.Barrier(3, timeout=5)
+
+    def call(value: int) -> int:
+        """Waits for the other calls before returning the value."""
+        barrier.wait()
+        return value
+
+    results = fan_out({"a": lambda: call(1), "b": lambda: call(2), "c": lambda: call(3)}, max_workers=3)
+
+    assert results == {"a": 1, "b": 2, "c": 3}
+
+
+def test_call_counter_waits_for_decay():
+    """Test that the counter sleeps until enough of the counter has decayed for the next call."""
+    counter = CallCounter(limit=4, decay=0.5)
+    clock = [100.0]
+
+    def sleep(seconds: float) -> None:
+        """Advances the fake clock."""
+        clock[0] += seconds
+
+    with patch("utils.concurrency.time.monotonic", side_effect=lambda: clock[0]), patch("utils.concurrency.time.sleep", side_effect=sleep) as mock_sleep:
+        counter.updated = clock[0]
+        counter.acquire(2)
+        counter.acquire(2)
+        counter.acquire(2)
+
+    mock_sleep.assert_called_once_with(4.0)
+    assert counter.counter == 4
+
+
+def _scheduler(limit: float = float("inf")) -> Scheduler:
+    """Creates a scheduler with one public counter and without backoff delays."""
+    return Scheduler({"public": CallCounter(limit=limit, decay=1)}, retries=2, backoff=0)
+
+
+def test_scheduler_coalesces_identical_calls_in_flight():
+    """Test that identical concurrent calls share the result of a single request."""
+    scheduler = _scheduler()
+    started, release = threading.Event(), threading.Event()
+
+    def get_ticker(pair: str) -> dict:
+        """Blocks until all callers are waiting for the result."""
+        started.set()
+        release.wait(5)
+        return {pair: {"c": ["1.0"]}}
+
+    func = Mock(side_effect=get_ticker)
+    leader = threading.Thread(target=lambda: scheduler.call(func, "XXBTZEUR", endpoint="public"))
+    leader.start()
+    started.wait(5)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(scheduler.call(func, "XXBTZEUR", endpoint="public"))) for _ in range(3)]
+
+    for thread in threads:
+        thread.start()
+
+    while scheduler.stats["public"]["coalesced"] < 3:
+        threading.Event().wait(0.01)
+
+    release.set()
+    leader.join(5)
+
+    for thread in threads:
+        thread.join(5)
+
+    assert results == [{"XXBTZEUR": {"c": ["1.0"]}}] * 3
+    func.assert_called_once_with("XXBTZEUR")
+    assert scheduler.stats["public"]["calls"] == 1
+
+
+def test_scheduler_retries_rate_limited_calls():
+    """Test that rate limited calls are retried, saturate the counter and fail after the last retry."""
+    scheduler = _scheduler()
+    func = Mock(side_effect=[KrakenApiLimitExceededError("EAPI:Rate limit exceeded"), "ok"])
+
+    with patch("utils.concurrency.time.sleep"), patch.object(CallCounter, "saturate") as mock_saturate:
+        assert scheduler.call(func, endpoint="public") == "ok"
+
+    mock_saturate.assert_called_once()
+    assert scheduler.stats["public"]["retries"] == 1
+
+    func = Mock(side_effect=KrakenApiLimitExceededError("EAPI:Rate limit exceeded"))
+
+    with patch("utils.concurrency.time.sleep"), pytest.raises(KrakenApiLimitExceededError):
+        scheduler.call(func, endpoint="public", coalesce=False)
+
+    assert func.call_count == 3
+
+
+def test_scheduler_serializes_private_calls():
+    """Test that signed calls of the private and trading endpoints never overlap."""
+    scheduler = Scheduler({endpoint: CallCounter(limit=float("inf"), decay=1) for endpoint in ("public", "private", "trading")}, backoff=0)
+    lock, active, overlaps = threading.Lock(), [0], []
+
+    def request(endpoint: str) -> None:
+        """Records whether another signed request is running at the same time."""
+        with lock:
+            active[0] += 1
+            overlaps.append(active[0] > 1)
+
+        threading.Event().wait(0.01)
+
+        with lock:
+            active[0] -= 1
+
+    endpoints = ["private", "trading"] * 3
+    fan_out({i: partial(scheduler.call, request, endpoint, endpoint=endpoint, coalesce=False) for i, endpoint in enumerate(endpoints)})
+
+    assert not any(overlaps)
@@ -4,7 +4,7 @@ import pytest
 from unittest.mock import Mock, patch
 from assets.asset import Asset
 from kraken.exceptions import KrakenUnknownAssetError
-from services.cost_basis import calculate_cost_basis
+from services.cost_basis import calculate_cost_basis, calculate_cost_bases
 
 
 @pytest.fixture
@@ -175,3 +175,22 @@ def test_calculate_cost_basis_no_trades(mock_user, mock_asset):
     expected = 0.0
 
     assert result == expected
+
+
+@patch('services.cost_basis.user')
+def test_calculate_cost_bases_multiple_assets(mock_user, three_buy_trades):
+    """Test that the cost basis of several assets is calculated with a single trade history request."""
+    three_buy_trades["trades"]["trade4"] = {"pair": "XETHZEUR", "type": "buy", "vol": "2.0", "cost": "4000.0", "fee": "40.0"}
+    mock_user.get_trades_history.return_value = three_buy_trades
+
+    btc = Mock(spec=Asset)
+    btc.pair = "XXBTZEUR"
+    eth = Mock(spec=Asset)
+    eth.pair = "XETHZEUR"
+
+    result = calculate_cost_bases([(btc, 0.7), (eth, 1.0)])
+
+    # BTC: 45450.0 * 0.7 = 31815.0 + 0.4% = 31942.26
+    # ETH: 4040.0 * 1.0 / 2.0 = 2020.0 + 0.4% = 2028.08
+    assert result == {"XXBTZEUR": 31942.26, "XETHZEUR": 2028.08}
+    mock_user.get_trades_history.assert_called_once_with(ofs=0)
@@ -0,0 +1,28 @@
+"""Tests for the OHLC data conversion."""
+
+import numpy as np
+from utils.data_converter import ohlc_to_arrays, ohlc_to_dataframe
+
+KRAKEN_ROWS = [
+    [1700000000, "35000.1", "36000.2", "34000.3", "35500.4", "35300.5", "123.45678901", 1234],
+    [1700086400, "35500.4", "35600.0", "35100.0", "35200.0", "35400.0", "98.7", 1000],
+]
+
+
+def test_ohlc_to_arrays_parses_typed_columns():
+    """Test that Kraken string prices are parsed into float64 and times and counts into int64 arrays."""
+    arrays = ohlc_to_arrays(KRAKEN_ROWS)
+
+    assert arrays["close"].dtype == np.float64
+    assert arrays["time"].dtype == np.int64
+    assert arrays["count"].dtype == np.int64
+    assert arrays["close"].tolist() == [35500.4, 35200.0]
+
+
+def test_ohlc_to_dataframe_has_numeric_columns():
+    """Test that the DataFrame needs no further float conversion and empty payloads keep the columns."""
+    df = ohlc_to_dataframe(KRAKEN_ROWS)
+
+    assert df["high"].max() == 36000.2
+    assert str(df["time"].iloc[0]) == "2023-11-14 22:13:20"
+    assert list(ohlc_to_dataframe([]).columns) == ["time", "open", "high", "low", "close", "vwap", "volume", "count"]
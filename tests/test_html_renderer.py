@@ -0,0 +1,60 @@
+"""Tests for the HTML renderer."""
+
+import os
+from unittest.mock import patch
+import azure.functions as func
+from utils import html_renderer
+from utils.html_renderer import html, jinja_env, template_mtimes
+
+
+def _request(etag: str | None = None) -> func.HttpRequest:
+    """Creates a GET request, optionally revalidating a page with the ETag."""
+    return func.HttpRequest(method="GET", body=None, url="/", headers={"If-None-Match": etag} if etag else {})
+
+
+def test_html_serves_unchanged_pages_from_cache():
+    """Test that identical render inputs reuse the rendered page and revalidating requests get 304."""
+    template = jinja_env.get_template("index.html.j2")
+
+    with patch.object(type(template), "render", autospec=True, side_effect=lambda *args, **kwargs: "page") as mock_render:
+        first = html("index.html.j2", request=_request(), headers="GET", unique="cache")
+        second = html("index.html.j2", request=_request(), headers="GET", unique="cache")
+        revalidated = html("index.html.j2", request=_request(f'W/{first.headers["ETag"]}'), headers="GET", unique="cache")
+
+    mock_render.assert_called_once()
+    assert first.get_body() == second.get_body() == b"page"
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+    assert revalidated.status_code == 304
+    assert revalidated.get_body() == b""
+
+
+def test_html_changes_etag_with_inputs():
+    """Test that other render inputs produce another ETag and a full response."""
+    first = html("index.html.j2", headers="GET")
+    changed = html("index.html.j2", request=_request(first.headers["ETag"]), headers="POST", max_age=30)
+
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != first.headers["ETag"]
+    assert changed.headers["Cache-Control"] == "private, max-age=30"
+
+
+def test_html_etag_ignores_key_order():
+    """Test that equal render inputs produce the same ETag regardless of the order of their keys."""
+    first = html("index.html.j2", headers="GET", data={"a": 1, "b": 2})
+    second = html("index.html.j2", headers="GET", data={"b": 2, "a": 1})
+
+    assert first.headers["ETag"] == second.headers["ETag"]
+
+
+def test_html_etag_follows_extended_and_included_templates():
+    """Test that a changed base or included template changes the ETag of the pages which use it."""
+    assert set(template_mtimes("balance.html.j2")) == {"balance.html.j2", "base.html.j2", "portfolio_chart.html.j2"}
+
+    first = html("index.html.j2", headers="GET")
+    getmtime = os.path.getmtime
+
+    with patch.object(html_renderer.os.path, "getmtime", lambda path: getmtime(path) + (path.endswith("base.html.j2") and 60)):
+        changed = html("index.html.j2", headers="GET")
+
+    assert changed.headers["ETag"] != first.headers["ETag"]
@@ -0,0 +1,79 @@
+"""Tests for the indicator engine."""
+
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from assets import indicators
+from assets.asset import Asset
+
+DAY = 86400
+
+
+@pytest.fixture
+def closes():
+    """A random walk of 400 close prices."""
+    return np.cumsum(np.random.default_rng(1).normal(0, 1, 400)) + 100
+
+
+def test_sma_and_rsi_match_rolling_means(closes):
+    """Test that SMA and RSI match the rolling mean calculations of pandas."""
+    close = pd.Series(closes)
+    change = close.diff()
+    avg_gain = change.mask(change < 0, 0.0).rolling(window=14, min_periods=14).mean()
+    avg_loss = -change.mask(change > 0, -0.0).rolling(window=14, min_periods=14).mean()
+
+    assert np.allclose(indicators.SMA(50).compute(closes), close.rolling(window=50, min_periods=50).mean(), equal_nan=True)
+    assert np.allclose(indicators.RSI(14).compute(closes), 100 - (100 / (1 + avg_gain / avg_loss)), equal_nan=True)
+
+
+@pytest.mark.parametrize("name", list(indicators.INDICATORS))
+def test_updates_match_full_computation(name, closes):
+    """Test that updating an indicator value by value gives the same result as computing the full series."""
+    indicator = indicators.INDICATORS[name]()
+    partial = indicator.compute(closes[:300])
+    updates = [indicator.update(value) for value in closes[300:]]
+
+    assert np.allclose(np.concatenate([partial, updates]), indicators.INDICATORS[name]().compute(closes), equal_nan=True)
+
+
+def test_compute_continues_memoized_moving_window(closes):
+    """Test that a window moving forward by new candles continues the memoized state instead of recomputing."""
+    times = np.arange(400)
+    indicators.compute("XXBTZEUR", "1d", "wilder_rsi", times[:300], closes[:300], window=14)
+
+    with patch.object(indicators.WilderRSI, "compute", side_effect=AssertionError("recomputed")):
+        result = indicators.compute("XXBTZEUR", "1d", "wilder_rsi", times[10:310], closes[10:310], window=14)
+
+    assert np.allclose(result, indicators.WilderRSI(14).compute(closes[:310])[10:], equal_nan=True)
+
+
+@patch("assets.asset.market_data.get_ohlc")
+def test_asset_adds_only_indicator_columns(mock_get_ohlc):
+    """Test that the asset adds the RSI and SMA columns without intermediate columns."""
+    start = int(time.time()) // DAY * DAY - 719 * DAY
+    closes = np.cumsum(np.random.default_rng(2).normal(0, 1, 720)) + 100
+    candles = [[start + i * DAY, "1", "2", "0.5", str(c), "1", "1", 1] for i, c in enumerate(closes)]
+    mock_get_ohlc.return_value = {"XXBTZEUR": candles, "last": 0}
+
+    asset = Asset("XXBTZEUR")
+    asset.calculate_rsi()
+    asset.calculate_sma(50)
+
+    assert set(asset.get_df_1d().columns) == {"time", "open", "high", "low", "close", "vwap", "volume", "count", "rsi", "sma_50"}
+    assert asset.get_df_1d()["sma_50"].iloc[-1] == pytest.approx(closes[-50:].mean())
+    assert asset.RSI_below(101)
+
+
+def test_incomplete_indicator_cannot_be_created():
+    """Test that an indicator without an update method fails when it is created."""
+
+    class Incomplete(indicators.Indicator):
+        """Indicator which only implements the full computation."""
+
+        def compute(self, values: np.ndarray) -> np.ndarray:
+            return values
+
+    with pytest.raises(TypeError):
+        Incomplete()
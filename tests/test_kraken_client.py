@@ -0,0 +1,80 @@
+"""Tests for the shared Kraken clients."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from kraken.spot import Market, User
+from utils import kraken_client
+
+
+class KrakenHandler(BaseHTTPRequestHandler):
+    """Answers every request with an empty Kraken result over a keep-alive connection."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        body = json.dumps({"error": [], "result": {"unixtime": 0}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def no_clients(monkeypatch):
+    """Starts the test without created clients."""
+    monkeypatch.setattr(kraken_client, "_clients", {})
+
+
+def test_clients_are_created_lazily_and_shared(no_clients):
+    """Test that the authenticated clients are only created on first use and shared afterwards."""
+    assert not kraken_client._clients  # pylint: disable=protected-access
+
+    assert callable(kraken_client.user.get_account_balance)
+    assert isinstance(kraken_client.get_client(User), User)
+    assert list(kraken_client._clients) == [User]  # pylint: disable=protected-access
+    assert kraken_client.market() is kraken_client.market()
+
+
+def test_connection_stats_count_reused_connections(no_clients):
+    """Test that repeated requests of the shared client reuse one connection."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KrakenHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        client = kraken_client.market()
+        client.URL = f"http://127.0.0.1:{server.server_address[1]}"
+
+        for _ in range(3):
+            client.get_system_status()
+
+        assert kraken_client.connection_stats()[Market.__name__] == {"requests": 3, "connections": 1, "reused": 2}
+
+    finally:
+        server.shutdown()
+
+
+
+def test_connection_stats_follow_renewed_session(no_clients):
+    """Test that the statistics are read from the session which replaced the expired one."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KrakenHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        client = kraken_client.market()
+        client.URL = f"http://127.0.0.1:{server.server_address[1]}"
+        client.get_system_status()
+        client.get_system_status()
+
+        client.MAX_SESSION_AGE = -1
+        client.get_system_status()
+
+        assert kraken_client.connection_stats()[Market.__name__] == {"requests": 1, "connections": 1, "reused": 0}
+
+    finally:
+        server.shutdown()
@@ -0,0 +1,75 @@
+"""Tests for the lot accounting engine."""
+
+from decimal import Decimal
+import pytest
+from services.lots import LotAccounts, LotBook
+from services.trade_ledger import TradeLedger
+
+
+def _trade(time: int, side: str, vol: str, cost: str, fee: str = "0", pair: str = "XXBTZEUR") -> dict:
+    """Creates a trade of the Kraken trade history."""
+    return {"pair": pair, "time": time, "type": side, "vol": vol, "cost": cost, "fee": fee}
+
+
+TRADES = [
+    _trade(1, "buy", "1.0", "100", "1"),
+    _trade(2, "buy", "1.0", "200", "2"),
+    _trade(3, "sell", "1.5", "450", "3"),
+]
+
+
+@pytest.mark.parametrize("method, cost, realized", [
+    # FIFO closes the first lot and half of the second: 447 - (101 + 101)
+    ("fifo", Decimal("101"), Decimal("245")),
+    # LIFO closes the second lot and half of the first: 447 - (202 + 50.5)
+    ("lifo", Decimal("50.5"), Decimal("194.5")),
+    # Average cost closes 1.5 of 2.0 at 151.5 per unit: 447 - 227.25
+    ("average", Decimal("75.75"), Decimal("219.75")),
+])
+def test_lot_book_matching_methods(method, cost, realized):
+    """Test that sells close the lots in the order of the matching method."""
+    book = LotBook("XXBTZEUR", method)
+
+    for trade in TRADES:
+        book.apply(trade)
+
+    assert book.volume == Decimal("0.5")
+    assert book.cost == cost
+    assert book.realized == realized
+    assert book.unrealized(300) == Decimal("150") - cost
+
+
+def test_lot_book_sell_without_lots():
+    """Test that volume sold beyond the open lots has no cost and is tracked as unmatched."""
+    book = LotBook("XXBTZEUR")
+    book.apply(_trade(1, "buy", "1.0", "100"))
+    book.apply(_trade(2, "sell", "1.5", "300"))
+
+    assert book.volume == 0 and book.cost == 0
+    assert book.unmatched == Decimal("0.5")
+    assert book.realized == Decimal("200")
+
+
+def test_lot_accounts_update_incrementally_and_restore_snapshot(tmp_path):
+    """Test that only new trades are applied, also at the same timestamp, and the state survives a restart."""
+    ledger = TradeLedger(str(tmp_path / "trades.sqlite"))
+    ledger.add({"T1": TRADES[0], "T2": TRADES[1]})
+    path = str(tmp_path / "lots.json")
+
+    accounts = LotAccounts(path, "fifo")
+    assert accounts.update(ledger) == 2
+    assert accounts.update(ledger) == 0
+
+    ledger.add({"T3": TRADES[2], "T4": _trade(3, "buy", "2.0", "4000", pair="XETHZEUR")})
+    assert accounts.update(ledger) == 2
+
+    restored = LotAccounts(path, "fifo")
+    assert restored.book("XXBTZEUR").to_dict() == accounts.book("XXBTZEUR").to_dict()
+    assert restored.update(ledger) == 0
+    assert restored.positions({"XXBTZEUR": 300.0, "XETHZEUR": 2500.0}) == {
+        "XXBTZEUR": {"volume": 0.5, "cost_basis": 101.0, "average_price": 202.0, "realized_pnl": 245.0, "unrealized_pnl": 49.0},
+        "XETHZEUR": {"volume": 2.0, "cost_basis": 4000.0, "average_price": 2000.0, "realized_pnl": 0.0, "unrealized_pnl": 1000.0},
+    }
+
+    with pytest.raises(ValueError):
+        LotAccounts(path, "lifo")
@@ -0,0 +1,83 @@
+"""Tests for the shared market data cache."""
+
+from unittest.mock import patch
+from utils import market_data
+from utils.market_data import TTLCache
+
+
+def test_ttl_cache_expires_entries():
+    """Test that entries are served until their time to live is over."""
+    cache = TTLCache(ttl=10)
+
+    with patch("utils.market_data.time.monotonic", return_value=100):
+        cache.set("key", "value")
+        assert cache.get("key") == "value"
+
+    with patch("utils.market_data.time.monotonic", return_value=111):
+        assert cache.get("key") is None
+
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test that the least recently used entry is evicted when the cache is full."""
+    cache = TTLCache(ttl=10, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+@patch("utils.market_data.market")
+def test_get_ticker_is_shared(mock_market):
+    """Test that repeated ticker requests for the same pair hit Kraken only once."""
+    mock_market.return_value.get_ticker.return_value = {"XXBTZEUR": {"c": ["50000.0", "1"]}}
+
+    assert market_data.get_ticker("XXBTZEUR") == market_data.get_ticker("XXBTZEUR")
+    mock_market.return_value.get_ticker.assert_called_once_with("XXBTZEUR")
+
+
+@patch("utils.market_data.market")
+def test_get_ohlc_shares_requests_within_one_candle(mock_market):
+    """Test that OHLC requests starting within the same candle share one cache entry."""
+    mock_market.return_value.get_ohlc.return_value = {"XXBTZEUR": [], "last": 0}
+
+    market_data.get_ohlc("XXBTZEUR", 1440, 86400 * 10 + 5)
+    market_data.get_ohlc("XXBTZEUR", 1440, 86400 * 10 + 60)
+    market_data.get_ohlc("XXBTZEUR", 1440, 86400 * 11)
+
+    assert mock_market.return_value.get_ohlc.call_count == 2
+
+
+@patch("utils.market_data.market")
+def test_get_tickers_fetches_missing_pairs_at_once(mock_market):
+    """Test that several tickers are fetched with a single request and served from the cache afterwards."""
+    mock_market.return_value.get_ticker.return_value = {"XXBTZEUR": {"c": ["50000.0", "1"]}, "XETHZEUR": {"c": ["3000.0", "1"]}}
+
+    tickers = market_data.get_tickers(["XXBTZEUR", "XETHZEUR"])
+
+    assert set(tickers) == {"XXBTZEUR", "XETHZEUR"}
+    assert market_data.get_ticker("XETHZEUR") == {"XETHZEUR": {"c": ["3000.0", "1"]}}
+    assert market_data.get_tickers(["XETHZEUR", "XXBTZEUR"]) == tickers
+    mock_market.return_value.get_ticker.assert_called_once_with(["XXBTZEUR", "XETHZEUR"])
+
+
+@patch("utils.market_data.market")
+def test_get_pair_metadata_is_registered_once(mock_market):
+    """Test that the order limits of several pairs are fetched with one request and served from the registry afterwards."""
+    mock_market.return_value.get_asset_pairs.return_value = {
+        "XXBTZEUR": {"altname": "XBTEUR", "ordermin": "0.00005", "lot_decimals": 8, "pair_decimals": 1, "tick_size": "0.1"},
+        "SOLEUR": {"altname": "SOLEUR", "ordermin": "0.02", "lot_decimals": 8, "pair_decimals": 2},
+    }
+
+    metadata = market_data.get_pair_metadata(["XXBTZEUR", "SOLEUR"])
+    assert metadata["XXBTZEUR"] == {"ordermin": 0.00005, "lot_decimals": 8, "pair_decimals": 1, "tick_size": 0.1}
+    assert metadata["SOLEUR"]["tick_size"] == 0.01
+
+    assert market_data.get_pair_metadata(["SOLEUR"]) == {"SOLEUR": metadata["SOLEUR"]}
+    mock_market.return_value.get_asset_pairs.assert_called_once_with(["XXBTZEUR", "SOLEUR"])
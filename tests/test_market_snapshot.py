@@ -0,0 +1,66 @@
+"""Tests for the market snapshot."""
+
+from unittest.mock import patch
+import pytest
+from assets.asset import Asset, AssetException
+from assets.market_snapshot import MarketSnapshot
+from kraken.exceptions import KrakenUnknownAssetPairError
+
+LIMITS = {"ordermin": 0.0001, "lot_decimals": 8, "pair_decimals": 1, "tick_size": 0.1}
+
+
+def _candles(count: int, close: float = 100.0) -> list:
+    """Creates daily Kraken OHLC rows with a constant close price."""
+    return [[1700006400 + i * 86400, close, close, close, close, close, 1.0, 1] for i in range(count)]
+
+
+@patch("assets.market_snapshot.market_data.get_pair_metadata", return_value={"XXBTZEUR": LIMITS})
+@patch("assets.market_snapshot.market_data.get_tickers", return_value={"XXBTZEUR": {"c": ["50000.0", "1"]}})
+def test_capture_loads_all_data_once(mock_tickers, mock_metadata):
+    """Test that the tickers and metadata of all assets are loaded with one call each and failures are kept as errors."""
+    btc, doge = Asset("XXBTZEUR"), Asset("XDGEUR")
+
+    def load_candles(asset, pair, interval, length):
+        if pair == "XDGEUR":
+            raise AssetException("Unknown asset pair")
+        return _candles(3)
+
+    with patch.object(Asset, "load_candles", autospec=True, side_effect=load_candles):
+        snapshot = MarketSnapshot.capture([btc, doge, btc])
+
+    mock_tickers.assert_called_once_with(["XXBTZEUR", "XDGEUR"])
+    mock_metadata.assert_called_once_with(["XXBTZEUR", "XDGEUR"])
+    assert snapshot.price("XXBTZEUR") == 50000.0
+    assert snapshot.limits("XXBTZEUR") == LIMITS
+    assert snapshot.candles("XXBTZEUR", "1w") == _candles(3)
+
+    with pytest.raises(AssetException, match="Unknown asset pair"):
+        snapshot.candles("XDGEUR", "1d")
+    with pytest.raises(AssetException):
+        snapshot.price("XDGEUR")
+
+
+@patch("assets.market_snapshot.market_data.get_pair_metadata", return_value={})
+@patch("assets.market_snapshot.market_data.get_tickers", side_effect=KrakenUnknownAssetPairError("Unknown asset pair"))
+def test_capture_records_failed_ticker_request(mock_tickers, mock_metadata):
+    """Test that a failed ticker request is raised when a price of the snapshot is read."""
+    with patch.object(Asset, "load_candles", return_value=_candles(3)):
+        snapshot = MarketSnapshot.capture([Asset("XXBTZEUR")], intervals=())
+
+    with pytest.raises(AssetException, match="Unknown asset pair"):
+        snapshot.price("XXBTZEUR")
+
+
+@patch("utils.market_data.get_ticker", side_effect=AssertionError("The snapshot must be used"))
+@patch("utils.market_data.get_ohlc", side_effect=AssertionError("The snapshot must be used"))
+def test_asset_reads_the_saved_snapshot(mock_ohlc, mock_ticker, tmp_path):
+    """Test that an asset with a restored snapshot evaluates its rules without market data requests."""
+    weekly = _candles(200, 60000.0)
+    MarketSnapshot(1.0, {"XXBTZEUR": {"c": ["50000.0", "1"]}}, {"XXBTZEUR 1d": _candles(720), "XXBTZEUR 1w": weekly}, {}).save(tmp_path / "snapshot.json")
+
+    asset = Asset("XXBTZEUR")
+    asset.snapshot = MarketSnapshot.load(tmp_path / "snapshot.json")
+
+    assert asset.get_asset_price() == 50000.0
+    assert asset.below_Weekly_SMA(200)
+    assert asset.accelerate(10) == 12.0
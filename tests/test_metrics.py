@@ -0,0 +1,53 @@
+"""Tests for the hot path metrics."""
+
+import json
+import logging
+import pytest
+import azure.functions as func
+from routes.metrics import get_metrics
+from utils import market_data
+from utils.concurrency import fan_out
+from utils.metrics import invocation, measure, prometheus, stats
+
+
+@measure("test.work")
+def work(fail: bool = False) -> int:
+    """Measured function which optionally fails."""
+    if fail:
+        raise ValueError("failed")
+
+    return 1
+
+
+def test_invocation_logs_calls_of_all_threads(caplog):
+    """Test that calls in threads started by the invocation are summarized in one log line."""
+    market_data.ticker_cache.set("XXBTZEUR", {})
+
+    with caplog.at_level(logging.INFO), invocation("test_route"):
+        fan_out({i: work for i in range(3)}, max_workers=3)
+        market_data.ticker_cache.get("XXBTZEUR")
+        market_data.ticker_cache.get("XETHZEUR")
+
+    summary = json.loads(caplog.records[-1].getMessage())
+
+    assert summary["invocation"] == "test_route"
+    assert summary["status"] == "ok"
+    assert summary["calls"]["test.work"]["count"] == 3
+    assert summary["cache_hit_rate"]["ticker"] == 0.5
+
+
+def test_prometheus_exports_totals():
+    """Test that failed calls are counted and the totals are exported in the Prometheus text format."""
+    before = dict(stats["test.work"])
+    work()
+
+    with pytest.raises(ValueError):
+        work(fail=True)
+
+    assert stats["test.work"]["count"] == before["count"] + 2
+    assert stats["test.work"]["errors"] == before["errors"] + 1
+    assert f'cb0t_call_seconds_count{{name="test.work"}} {before["count"] + 2}' in prometheus()
+
+    response = get_metrics(func.HttpRequest(method="GET", body=None, url="/api/metrics"))
+    assert response.status_code == 200
+    assert 'cb0t_cache_hits_total{cache="ticker"}' in response.get_body().decode()
@@ -0,0 +1,25 @@
+"""Tests for the parameter sweep."""
+
+import numpy as np
+import pandas as pd
+from services.backtest import run_strategy, summarize
+from services.parameter_sweep import sweep
+
+
+def test_sweep_matches_single_backtests():
+    """Test that the parallel sweep returns every combination ranked and equal to a single backtest."""
+    close = np.cumsum(np.random.default_rng(4).normal(0, 50, 1500)) + 30000
+    prices = pd.DataFrame({"time": pd.date_range("2020-01-01", periods=1500, freq="D"), "high": close * 1.01, "close": close})
+    grid = {"sma_window": [20, 50], "rsi_threshold": [None, 40], "euro": [8], "cadence": [1, 2]}
+
+    results = sweep(prices, grid, max_workers=2, chunksize=3)
+
+    assert len(results) == 8
+    assert results["return_pct"].is_monotonic_decreasing
+
+    row = results[(results["sma_window"] == 50) & (results["rsi_threshold"] == 40) & (results["cadence"] == 2)].iloc[0]
+    rules = [{"rule": "below_weekly_sma", "window": 50}, {"rule": "every_n_days", "n": 2}, {"rule": "rsi_below", "threshold": 40}]
+    expected = summarize(run_strategy(prices, rules, 8, sizing="accelerate"))
+
+    assert row["invested"] == expected["invested"]
+    assert row["return_pct"] == expected["return_pct"]
@@ -0,0 +1,110 @@
+"""Tests for the portfolio history."""
+
+import pytest
+from services.lots import LotBook
+from services.portfolio import DAY, get_portfolio_history
+from services.trade_ledger import get_ledger
+from utils.candle_store import get_candle_store
+
+START = 1700006400
+
+
+def _candles(closes: list[float], start: int = START) -> list:
+    """Creates daily Kraken OHLC rows with the given close prices."""
+    return [[start + i * DAY, c, c, c, c, c, 1.0, 1] for i, c in enumerate(closes)]
+
+
+def _trade(time: int, side: str, vol: str, cost: str, pair: str = "XXBTZEUR") -> dict:
+    """Creates a trade of the Kraken trade history without fee."""
+    return {"pair": pair, "time": time, "type": side, "vol": vol, "cost": cost, "fee": "0"}
+
+
+def test_pair_history_aligns_trades_with_daily_candles():
+    """Test that a day closes with the trades made during the day and values the holdings at the close."""
+    get_candle_store().add("XXBTZEUR", 1440, _candles([100, 110, 120, 130]))
+    get_ledger().add({
+        "T1": _trade(START + 3600, "buy", "2.0", "200"),
+        "T2": _trade(START + 2 * DAY + 60, "sell", "1.0", "125"),
+    })
+
+    history = get_portfolio_history("fifo").pair_history("XXBTZEUR")
+
+    assert history["holdings"].tolist() == [2.0, 2.0, 1.0, 1.0]
+    assert history["value"].tolist() == [200.0, 220.0, 120.0, 130.0]
+    assert history["cost_basis"].tolist() == [200.0, 200.0, 100.0, 100.0]
+    assert history["realized_pnl"].tolist() == [0.0, 0.0, 25.0, 25.0]
+    assert history["pnl"].tolist() == [0.0, 20.0, 45.0, 55.0]
+
+
+def test_history_is_updated_with_new_candles_and_trades():
+    """Test that the cached history follows new candles without replaying the ledger and new trades with one replay."""
+    store, ledger = get_candle_store(), get_ledger()
+    store.add("XXBTZEUR", 1440, _candles([100, 110]))
+    ledger.add({"T1": _trade(START, "buy", "1.0", "100")})
+    portfolio = get_portfolio_history("fifo")
+
+    assert portfolio.pair_history("XXBTZEUR")["value"].tolist() == [100.0, 110.0]
+    states = portfolio.states
+
+    store.add("XXBTZEUR", 1440, _candles([115, 120], start=START + DAY))
+    assert portfolio.pair_history("XXBTZEUR")["value"].tolist() == [100.0, 115.0, 120.0]
+    assert portfolio.states is states
+
+    ledger.add({"T2": _trade(START + 2 * DAY, "buy", "1.0", "120")})
+    assert portfolio.pair_history("XXBTZEUR")["value"].tolist() == [100.0, 115.0, 240.0]
+    assert portfolio.states is not states
+
+
+def test_new_trade_is_applied_without_replaying_the_ledger(monkeypatch):
+    """Test that a new trade is applied to the kept lot books and the states of the earlier trades are kept."""
+    store, ledger = get_candle_store(), get_ledger()
+    store.add("XXBTZEUR", 1440, _candles([100, 110, 120]))
+    store.add("SOLEUR", 1440, _candles([10, 20, 30]))
+    ledger.add({
+        "T1": _trade(START, "buy", "1.0", "100"),
+        "T2": _trade(START, "buy", "2.0", "20", pair="SOLEUR"),
+    })
+    portfolio = get_portfolio_history("fifo")
+    portfolio.pair_history("XXBTZEUR")
+    btc_states, sol_states = portfolio.states["XXBTZEUR"], portfolio.states["SOLEUR"]
+
+    applied = []
+    apply = LotBook.apply
+    monkeypatch.setattr(LotBook, "apply", lambda book, trade: applied.append(trade) or apply(book, trade))
+    ledger.add({"T3": _trade(START + DAY, "sell", "1.0", "30", pair="SOLEUR")})
+
+    assert portfolio.pair_history("SOLEUR")["realized_pnl"].tolist() == [0.0, 20.0, 20.0]
+    assert applied == [_trade(START + DAY, "sell", "1.0", "30", pair="SOLEUR")]
+    assert portfolio.states["XXBTZEUR"] is btc_states
+    assert portfolio.states["SOLEUR"][:1].tolist() == sol_states.tolist()
+
+
+def test_total_sums_pairs_on_common_days():
+    """Test that the total only covers the days with candles of all pairs."""
+    get_candle_store().add("XXBTZEUR", 1440, _candles([100, 110, 120]))
+    get_candle_store().add("SOLEUR", 1440, _candles([10, 20], start=START + DAY))
+    get_ledger().add({
+        "T1": _trade(START, "buy", "1.0", "100"),
+        "T2": _trade(START, "buy", "2.0", "20", pair="SOLEUR"),
+    })
+
+    total = get_portfolio_history().total(["XXBTZEUR", "SOLEUR"])
+
+    assert len(total) == 2
+    assert total["value"].tolist() == [130.0, 160.0]
+    assert total["cost_basis"].tolist() == [120.0, 120.0]
+    assert total["pnl"].tolist() == pytest.approx([10.0, 40.0])
+
+
+def test_total_leaves_out_pairs_without_candles():
+    """Test that a held pair without stored candles does not hide the history of the other pairs."""
+    get_candle_store().add("XXBTZEUR", 1440, _candles([100, 110]))
+    get_ledger().add({
+        "T1": _trade(START, "buy", "1.0", "100"),
+        "T2": _trade(START, "buy", "2.0", "20", pair="SOLEUR"),
+    })
+
+    total = get_portfolio_history().total(["XXBTZEUR", "SOLEUR"])
+
+    assert total["value"].tolist() == [100.0, 110.0]
+    assert total["cost_basis"].tolist() == [100.0, 100.0]
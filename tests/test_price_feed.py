@@ -0,0 +1,105 @@
+"""Tests for the streaming price feed against a local fake Kraken WebSocket server."""
+
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import patch
+import pytest
+from websockets.asyncio.server import serve
+from utils import market_data
+from utils.price_feed import PriceFeed
+
+TICKER = {"symbol": "BTC/EUR", "bid": 49999.9, "bid_qty": 1.2, "ask": 50000.1, "ask_qty": 0.8, "last": 50000.0,
+          "volume": 120.5, "vwap": 49800.0, "low": 48000.0, "high": 51000.0, "change": 500.0, "change_pct": 1.0}
+
+
+class FakeKraken:
+    """Local WebSocket server which answers subscriptions like the Kraken WebSocket API v2 and sends heartbeats."""
+
+    def __init__(self):
+        self.subscriptions = []
+        self.started = threading.Event()
+        self.port = None
+        self.loop = None
+        self.stopping = None
+        self.thread = threading.Thread(target=asyncio.run, args=(self._run(),), daemon=True)
+
+    async def _handler(self, socket) -> None:
+        async def heartbeat():
+            while True:
+                await socket.send(json.dumps({"channel": "heartbeat"}))
+                await asyncio.sleep(0.1)
+
+        task = asyncio.create_task(heartbeat())
+
+        try:
+            async for raw in socket:
+                message = json.loads(raw)
+
+                if message.get("method") != "subscribe":
+                    continue
+
+                params = message["params"]
+                self.subscriptions.append(params)
+                await socket.send(json.dumps({"channel": params["channel"], "type": "snapshot", "data": [TICKER]}))
+
+        finally:
+            task.cancel()
+
+    async def _run(self) -> None:
+        self.stopping = asyncio.Event()
+        self.loop = asyncio.get_running_loop()
+
+        async with serve(self._handler, "127.0.0.1", 0) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self.started.set()
+            await self.stopping.wait()
+
+    def __enter__(self) -> "FakeKraken":
+        self.thread.start()
+        self.started.wait(5)
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.loop.call_soon_threadsafe(self.stopping.set)
+        self.thread.join(5)
+
+
+@pytest.fixture
+def feed():
+    """Runs a price feed for BTC/EUR against the fake server."""
+    with FakeKraken() as server:
+        feed = PriceFeed(["XXBTZEUR", "UNKNOWN"], ws_url=f"ws://127.0.0.1:{server.port}").start()
+        assert feed.subscribed.wait(10)
+
+        deadline = time.monotonic() + 5
+        while feed.get_ticker("XXBTZEUR") is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        yield feed, server
+        feed.stop()
+
+
+def test_price_feed_keeps_latest_ticker(feed):
+    """Test that the feed subscribes the known pairs and books their tickers."""
+    feed, server = feed
+
+    assert [s["channel"] for s in server.subscriptions] == ["ticker"]
+    assert server.subscriptions[0]["symbol"] == ["BTC/EUR"]
+    assert feed.get_ticker("XXBTZEUR")["XXBTZEUR"]["c"][0] == "50000.0"
+
+
+@patch("utils.market_data.market")
+def test_market_data_reads_streamed_prices(mock_market, feed):
+    """Test that tickers are served from the feed without REST requests while it is fresh."""
+    feed, _ = feed
+
+    with patch("utils.market_data.get_price_feed", return_value=feed):
+        assert market_data.get_tickers(["XXBTZEUR"])["XXBTZEUR"]["b"][0] == "49999.9"
+
+        feed.max_age = 0
+        mock_market.return_value.get_ticker.return_value = {"XXBTZEUR": {"c": ["49000.0", "1"]}}
+        assert market_data.get_ticker("XXBTZEUR")["XXBTZEUR"]["c"][0] == "49000.0"
+
+    mock_market.return_value.get_ticker.assert_called_once_with("XXBTZEUR")
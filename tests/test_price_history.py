@@ -0,0 +1,102 @@
+"""Tests for the local price history cache."""
+
+import os
+from unittest.mock import Mock
+import pandas as pd
+import pytest
+from services.price_history import CsvProvider, PriceHistory, get_price_history
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "btc_usd_daily.csv")
+
+
+def test_seed_and_incremental_refresh(data_dir):
+    """Test that a seeded cache only requests the days since the last stored day and replaces that day."""
+    fixture = CsvProvider(FIXTURE).fetch("BTC-USD")
+    seed = Mock()
+    seed.fetch.return_value = fixture.iloc[:1000]
+    provider = Mock()
+    provider.fetch.return_value = fixture.iloc[999:]
+
+    history = PriceHistory("BTC-USD", provider, str(data_dir / "history"))
+    history.seed(seed)
+
+    assert history.refresh() == 501
+    provider.fetch.assert_called_once_with("BTC-USD", int(fixture["time"].iloc[999]))
+
+    df = history.load()
+    assert len(df) == 1500
+    assert df["close"].tolist() == fixture["close"].tolist()
+    assert df["time"].iloc[-1] == pd.Timestamp("2025-02-08")
+    assert history.version() == fixture["time"].iloc[-1]
+
+
+def test_refresh_keeps_mapped_columns_of_readers(data_dir):
+    """Test that a refresh replaces the column files, a map taken before still reads the previous days."""
+    fixture = CsvProvider(FIXTURE).fetch("BTC-USD")
+    seed = Mock()
+    seed.fetch.return_value = fixture.iloc[:1000]
+    provider = Mock()
+    provider.fetch.return_value = fixture.iloc[10:20]
+
+    history = PriceHistory("BTC-USD", provider, str(data_dir / "history"))
+    history.seed(seed)
+    mapped = history._read()  # pylint: disable=protected-access
+
+    history.refresh()
+
+    assert mapped["close"].tolist() == fixture["close"].iloc[:1000].tolist()
+    assert len(history.load()) == 20
+    assert not [name for name in os.listdir(data_dir / "history") if name.endswith(".tmp")]
+
+
+def test_load_serves_latest_days_without_refresh(data_dir):
+    """Test that a fresh cache is served from disk without asking the provider."""
+    provider = Mock()
+    history = PriceHistory("BTC-USD", provider, str(data_dir / "history"))
+    history.seed(CsvProvider(FIXTURE))
+
+    df = history.load(100)
+
+    assert len(df) == 100
+    assert df["close"].dtype == "float64"
+    provider.fetch.assert_not_called()
+
+
+def test_load_serves_stored_days_when_refresh_fails(data_dir):
+    """Test that a failed refresh of an outdated cache serves the stored days and an empty cache raises the error."""
+    provider = Mock()
+    provider.fetch.side_effect = ConnectionError("Yahoo Finance is not reachable")
+    history = PriceHistory("BTC-USD", provider, str(data_dir / "history"), max_age=0)
+
+    with pytest.raises(ConnectionError):
+        history.load()
+
+    history.seed(CsvProvider(FIXTURE))
+
+    assert len(history.load(100)) == 100
+    provider.fetch.assert_called()
+
+
+def test_failed_refresh_is_retried_after_the_retry_interval(data_dir):
+    """Test that an outdated cache whose refresh failed is not refreshed again on every request until the retry interval passed."""
+    provider = Mock()
+    provider.fetch.side_effect = ConnectionError("Yahoo Finance is not reachable")
+    history = PriceHistory("BTC-USD", provider, str(data_dir / "history"), max_age=3600, retry_after=300)
+    history.seed(CsvProvider(FIXTURE))
+    os.utime(data_dir / "history" / "time.bin", (0, 0))
+
+    assert history.needs_refresh()
+    assert len(history.load(10)) == 10
+    assert not history.needs_refresh()
+    assert len(history.load(10)) == 10
+    provider.fetch.assert_called_once()
+
+    history.failed_refresh -= 301
+    assert history.needs_refresh()
+
+
+def test_get_price_history_uses_csv_provider(data_dir, monkeypatch):
+    """Test that the CSV fixture can replace Yahoo Finance for offline runs."""
+    monkeypatch.setenv("CB0THISTORYCSV", FIXTURE)
+
+    assert len(get_price_history("BTC-USD").load(3560)) == 1500
@@ -0,0 +1,23 @@
+"""Tests for the recording and replay of API responses."""
+
+from unittest.mock import Mock
+import pytest
+from utils import concurrency
+
+
+def test_record_and_replay_kraken_calls(tmp_path, monkeypatch):
+    """Test that recorded responses are replayed without calling Kraken, independent of time dependent parameters."""
+    cassette = str(tmp_path / "kraken.json")
+    get_ohlc = Mock(return_value={"XXBTZEUR": [[1, "2"]]})
+    get_ohlc.__qualname__ = "Market.get_ohlc"
+
+    monkeypatch.setenv("CB0TCASSETTE", cassette)
+    monkeypatch.setenv("CB0TCASSETTEMODE", "record")
+    assert concurrency.public_call(get_ohlc, "XXBTZEUR", 1440, since=100) == {"XXBTZEUR": [[1, "2"]]}
+
+    monkeypatch.setenv("CB0TCASSETTEMODE", "replay")
+    assert concurrency.public_call(get_ohlc, "XXBTZEUR", 1440, since=200) == {"XXBTZEUR": [[1, "2"]]}
+    get_ohlc.assert_called_once()
+
+    with pytest.raises(KeyError):
+        concurrency.public_call(get_ohlc, "XETHZEUR", 1440, since=200)
@@ -0,0 +1,67 @@
+"""Tests for the result cache."""
+
+import threading
+import time
+from utils.result_cache import ResultCache
+
+
+def test_result_is_computed_once_per_version():
+    """Test that a result is computed synchronously once and served for the same version."""
+    cache = ResultCache()
+    calls = []
+
+    def compute() -> tuple[int, str]:
+        """Computes the result of version 1."""
+        calls.append(1)
+        return 1, "result"
+
+    assert cache.get("key", 1, compute) == "result"
+    assert cache.get("key", 1, compute) == "result"
+    assert len(calls) == 1
+
+
+def test_outdated_result_is_served_while_revalidating():
+    """Test that an outdated result is served stale and replaced by one background computation."""
+    cache = ResultCache()
+    cache.get("key", 1, lambda: (1, "old"))
+    release = threading.Event()
+    calls = []
+
+    def compute() -> tuple[int, str]:
+        """Computes the result of version 2 after the test released it."""
+        calls.append(1)
+        release.wait(5)
+        return 2, "new"
+
+    assert cache.get("key", 2, compute) == "old"
+    assert cache.get("key", 2, compute) == "old"
+    release.set()
+
+    # wait for the background thread to store the new result
+    for _ in range(500):
+        if not cache.refreshing:
+            break
+        time.sleep(0.01)
+
+    assert cache.get("key", 2, compute) == "new"
+    assert len(calls) == 1
+
+
+def test_outdated_result_is_recomputed_without_stale_mode():
+    """Test that outdated results are recomputed synchronously if stale-while-revalidate is disabled."""
+    cache = ResultCache(stale_while_revalidate=False)
+    cache.get("key", 1, lambda: (1, "old"))
+
+    assert cache.get("key", 2, lambda: (2, "new")) == "new"
+    assert cache.get("key", 2, lambda: (2, "newer"), revalidate=True) == "newer"
+
+
+def test_least_recently_used_results_are_evicted():
+    """Test that a bounded cache evicts the result which was used longest ago."""
+    cache = ResultCache(stale_while_revalidate=False, max_entries=2)
+    cache.get("a", 1, lambda: (1, "a"))
+    cache.get("b", 1, lambda: (1, "b"))
+    cache.get("a", 1, lambda: (1, "unused"))
+    cache.get("c", 1, lambda: (1, "c"))
+
+    assert list(cache.entries) == ["a", "c"]
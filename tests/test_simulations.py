@@ -1,9 +1,17 @@
 """Unit tests for simulations route."""
 
+import os
 import azure.functions as func
+import pytest
 from routes.simulations import get_simulations
 
 
+@pytest.fixture(autouse=True)
+def offline_history(monkeypatch):
+    """Serves the price history from the CSV fixture instead of Yahoo Finance."""
+    monkeypatch.setenv("CB0THISTORYCSV", os.path.join(os.path.dirname(__file__), "fixtures", "btc_usd_daily.csv"))
+
+
 def test_get_simulations():
     """Test that get_simulations returns a valid HTTP response."""
     req = func.HttpRequest(method="GET", body=None, url="/api/simulations", params={})
@@ -1,9 +1,18 @@
 """Unit tests for ticker route."""
 
+from unittest.mock import patch
+import pytest
 import azure.functions as func
-from routes.ticker import get_ticker
+from routes.ticker import charts, get_ticker
+from utils.data_converter import ohlc_to_arrays
 
+WEEK = 604800
+OHLC = {"XXBTZEUR": [[1600000000 + i * WEEK, f"{100 + i}", f"{110 + i}", f"{90 + i}", f"{105 + i}", f"{100 + i}", "1.5", 10] for i in range(120)], "last": 0}
+TICKER = {"XXBTZEUR": {"c": ["225.0", "1"]}}
+PAIRS = {"XXBTZEUR": {"wsname": "XBT/EUR", "ordermin": "0.0001"}}
 
+
+@pytest.mark.usefixtures("kraken_cassette")
 def test_get_ticker():
     """Test that get_ticker returns a valid HTTP response."""
     req = func.HttpRequest(method="GET", body=None, url="/api/ticker", params={})
@@ -15,6 +24,7 @@ def test_get_ticker():
     assert len(response.get_body()) > 0
 
 
+@pytest.mark.usefixtures("kraken_cassette")
 def test_get_ticker_with_pair():
     """Test that get_ticker works with custom pair parameter."""
     req = func.HttpRequest(method="GET", body=None, url="/api/ticker", params={"pair": "XETHZEUR"})
@@ -24,3 +34,42 @@ def test_get_ticker_with_pair():
     assert response.status_code == 200
     assert response.mimetype == "text/html"
     assert len(response.get_body()) > 0
+
+
+@patch("routes.ticker.market_data.get_ohlc", return_value=OHLC)
+@patch("routes.ticker.market_data.get_asset_pairs", return_value=PAIRS)
+@patch("routes.ticker.market_data.get_tickers", return_value=TICKER)
+def test_get_ticker_svg_chart_is_cached(mock_tickers, mock_pairs, mock_ohlc):
+    """Test that the SVG chart is the default and only rendered again for new candles."""
+    req = func.HttpRequest(method="GET", body=None, url="/api/ticker", params={})
+    charts.clear()
+
+    with patch("routes.ticker.ohlc_to_arrays", wraps=ohlc_to_arrays) as mock_arrays:
+        first = get_ticker(req).get_body()
+        second = get_ticker(req).get_body()
+
+    assert first == second
+    assert b"<svg" in first and b"plotly" not in first
+    assert b'"c":[105.0,106.0' in first
+    mock_arrays.assert_called_once()
+
+
+@patch("routes.ticker.market_data.get_ohlc", return_value=OHLC)
+@patch("routes.ticker.market_data.get_asset_pairs", return_value=PAIRS)
+@patch("routes.ticker.market_data.get_tickers", return_value=TICKER)
+def test_get_ticker_chart_parameter(mock_tickers, mock_pairs, mock_ohlc):
+    """Test that the Plotly chart can be selected and unknown charts are rejected."""
+    plotly = get_ticker(func.HttpRequest(method="GET", body=None, url="/api/ticker", params={"chart": "plotly"}))
+    unknown = get_ticker(func.HttpRequest(method="GET", body=None, url="/api/ticker", params={"chart": "png"}))
+
+    assert b"candlestick-chart" in plotly.get_body() and b"<svg" not in plotly.get_body()
+    assert unknown.status_code == 400
+
+
+@patch("routes.ticker.market_data.get_tickers")
+def test_get_ticker_rejects_multiple_pairs(mock_tickers):
+    """Test that a comma separated list of pairs is rejected before any request."""
+    response = get_ticker(func.HttpRequest(method="GET", body=None, url="/api/ticker", params={"pair": "XXBTZEUR,SOLEUR"}))
+
+    assert response.status_code == 400
+    mock_tickers.assert_not_called()
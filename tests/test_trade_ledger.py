@@ -0,0 +1,83 @@
+"""Tests for the local trade ledger."""
+
+from unittest.mock import Mock
+from services.trade_ledger import TradeLedger, get_ledger
+
+
+def _trade(pair: str, time: float, trade_type: str = "buy") -> dict:
+    """Creates a minimal Kraken trade entry."""
+    return {"pair": pair, "time": time, "type": trade_type, "vol": "1.0", "cost": "100.0", "fee": "1.0"}
+
+
+def test_sync_fetches_full_history_once(data_dir):
+    """Test that the first sync pages through the history and the next sync only requests newer trades."""
+    first_page = {f"T{i}": _trade("XXBTZEUR", 1000 - i) for i in range(50)}
+    second_page = {"T50": _trade("XETHZEUR", 900)}
+
+    user = Mock()
+    user.get_trades_history.side_effect = [{"trades": first_page, "count": 51}, {"trades": second_page, "count": 51}, {"trades": {}, "count": 0}]
+
+    ledger = TradeLedger(str(data_dir / "trades.sqlite"))
+    assert ledger.sync(user) == 51
+    assert ledger.sync(user) == 0
+
+    calls = user.get_trades_history.call_args_list
+    assert calls[0].kwargs == {"ofs": 0}
+    assert calls[1].kwargs == {"end": 1000, "ofs": 50}
+    assert calls[2].kwargs == {"start": 1000, "ofs": 0}
+
+
+def test_get_trades_by_pair_newest_first(data_dir):
+    """Test that trades are filtered by pair and returned from newest to oldest."""
+    ledger = TradeLedger(str(data_dir / "trades.sqlite"))
+    ledger.add({"A": _trade("XXBTZEUR", 1), "B": _trade("XETHZEUR", 2), "C": _trade("XXBTZEUR", 3)})
+    ledger.add({"A": _trade("XXBTZEUR", 1)})
+
+    assert list(ledger.get_trades("XXBTZEUR")) == ["C", "A"]
+    assert list(ledger.get_trades()) == ["C", "B", "A"]
+    assert ledger.get_trades("XXBTZEUR")["C"]["cost"] == "100.0"
+
+
+def test_ledger_is_persistent(data_dir):
+    """Test that a reopened ledger still contains the stored trades."""
+    path = str(data_dir / "trades.sqlite")
+    TradeLedger(path).add({"A": _trade("SOLEUR", 5)})
+
+    assert TradeLedger(path).last_time() == 5
+    assert get_ledger().path == path
+
+
+def test_sync_fetches_counted_pages_in_order(data_dir):
+    """Test that the remaining pages of the total count are requested one after another by offset."""
+    def get_trades_history(ofs: int, end: int | None = None) -> dict:
+        """Returns a page of the fake trade history."""
+        return {"trades": {f"T{i}": _trade("XXBTZEUR", 1000 - i) for i in range(ofs, min(ofs + 50, 120))}, "count": 120}
+
+    user = Mock()
+    user.get_trades_history.side_effect = get_trades_history
+
+    ledger = TradeLedger(str(data_dir / "trades.sqlite"))
+
+    assert ledger.sync(user) == 120
+    assert [call.kwargs["ofs"] for call in user.get_trades_history.call_args_list] == [0, 50, 100]
+    assert list(ledger.get_trades())[:2] == ["T0", "T1"]
+
+
+def test_sync_does_not_miss_trades_executed_during_the_sync(data_dir):
+    """Test that a trade executed after the first page does not shift the offsets of the remaining pages."""
+    history = [(f"T{i}", _trade("XXBTZEUR", 1000 - i)) for i in range(100)]
+
+    def get_trades_history(ofs: int, end: int | None = None) -> dict:
+        """Returns a page of the fake trade history, a new trade is executed after the first request."""
+        listing = [(txid, trade) for txid, trade in history if end is None or trade["time"] <= end]
+        page = {"trades": dict(listing[ofs:ofs + 50]), "count": len(listing)}
+        history.insert(0, ("NEW", _trade("XXBTZEUR", 1001)))
+        return page
+
+    user = Mock()
+    user.get_trades_history.side_effect = get_trades_history
+
+    ledger = TradeLedger(str(data_dir / "trades.sqlite"))
+    ledger.sync(user)
+
+    assert set(ledger.get_trades()) == {f"T{i}" for i in range(100)}
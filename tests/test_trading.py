@@ -0,0 +1,56 @@
+"""Tests for the trading service."""
+
+from unittest.mock import Mock, patch
+from assets.asset import Asset
+from assets.market_snapshot import MarketSnapshot
+from services.trading import accumulate_batch
+
+LIMITS = {"ordermin": 0.0001, "lot_decimals": 8, "pair_decimals": 1, "tick_size": 0.1}
+
+
+def _asset(pair: str, ath: float) -> Asset:
+    """Creates an asset with a fixed ATH."""
+    asset = Asset(pair)
+    asset.get_ath = Mock(return_value=ath)
+    asset.get_asset_price = Mock(side_effect=AssertionError("The price snapshot must be used"))
+    return asset
+
+
+@patch("services.trading.trade")
+@patch("services.trading.market_data.get_pair_metadata", return_value={"XXBTZEUR": LIMITS, "SOLEUR": {**LIMITS, "ordermin": 1.0}})
+@patch("services.trading.get_asset_prices", return_value={"XXBTZEUR": 50000.0, "SOLEUR": 100.0})
+def test_accumulate_batch_sizes_orders_from_one_snapshot(mock_prices, mock_metadata, mock_trade, monkeypatch):
+    """Test that all orders are sized with one price snapshot and raised to the order minimum."""
+    monkeypatch.setenv("CB0TENV", "PROD")
+    btc, sol = _asset("XXBTZEUR", 100000.0), _asset("SOLEUR", 200.0)
+
+    assert accumulate_batch([(btc, 10), (sol, 4)]) == 2
+
+    mock_prices.assert_called_once_with([btc, sol])
+    mock_metadata.assert_called_once_with(["XXBTZEUR", "SOLEUR"])
+    mock_trade.create_order.assert_any_call(ordertype="market", pair="XXBTZEUR", side="buy", volume=0.0004)
+    mock_trade.create_order.assert_any_call(ordertype="market", pair="SOLEUR", side="buy", volume=1.0)
+
+
+@patch("services.trading.trade")
+@patch("services.trading.market_data.get_pair_metadata", return_value={"XXBTZEUR": LIMITS})
+@patch("services.trading.get_asset_prices", return_value={"XXBTZEUR": 50000.0})
+def test_accumulate_batch_outside_production(mock_prices, mock_metadata, mock_trade, monkeypatch):
+    """Test that no order is created outside the production environment."""
+    monkeypatch.setenv("CB0TENV", "DEV")
+
+    assert accumulate_batch([(_asset("XXBTZEUR", 100000.0), 10)]) == 0
+    mock_trade.create_order.assert_not_called()
+
+
+@patch("services.trading.trade")
+@patch("services.trading.get_asset_prices")
+def test_accumulate_batch_with_market_snapshot(mock_prices, mock_trade, monkeypatch):
+    """Test that orders are sized with the market snapshot without fetching prices."""
+    monkeypatch.setenv("CB0TENV", "PROD")
+    snapshot = MarketSnapshot(0, {"XXBTZEUR": {"c": ["50000.0", "1"]}}, {}, {"XXBTZEUR": LIMITS})
+
+    assert accumulate_batch([(_asset("XXBTZEUR", 100000.0), 10), (_asset("SOLEUR", 200.0), 4)], snapshot) == 1
+
+    mock_prices.assert_not_called()
+    mock_trade.create_order.assert_called_once_with(ordertype="market", pair="XXBTZEUR", side="buy", volume=0.0004)
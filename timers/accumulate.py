@@ -2,9 +2,7 @@
 
 import logging
 import azure.functions as func
-from assets.asset_pairs import BTCEUR, ETHEUR, SOLEUR
-from services.trading import accumulate
-from datetime import datetime
+from services.accumulation import load_plan, load_snapshot, run_plan
 
 
 def accumulate_assets(timer: func.TimerRequest) -> None:
@@ -12,19 +10,8 @@ def accumulate_assets(timer: func.TimerRequest) -> None:
     if timer.past_due:
         logging.info("The timer is past due! Will continue.")
 
-    assets_accumulated = 0
-
-    btceur = BTCEUR()
-    if btceur.below_Weekly_SMA(200) and datetime.now().day % 2 == 0:
-        assets_accumulated += accumulate(btceur, 8)
-
-    # etheur = ETHEUR()
-    # if etheur.below_Weekly_SMA(200) and datetime.now().day % 2 == 0:
-    #    assets_accumulated += accumulate(etheur, 4)
-
-    # soleur = SOLEUR()
-    # if (soleur.RSI_below(35)):
-    #     assets_accumulated += accumulate(soleur, 4)
+    # The assets, rules and euro amounts are defined by the accumulation plan, see services.accumulation
+    assets_accumulated = run_plan(load_plan(), load_snapshot())
 
     logging.info(f"Total assets accumulated: {assets_accumulated}")
 
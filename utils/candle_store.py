@@ -0,0 +1,91 @@
+"""Persistent local store for OHLC candles which is topped up incrementally from Kraken."""
+
+import logging
+import sqlite3
+import threading
+import time
+from typing import Callable
+from utils.storage import data_path
+
+# Kraken returns at most 720 candles per OHLC request
+KRAKEN_MAX_CANDLES = 720
+
+
+class CandleStore:
+    """SQLite backed store of OHLC candles keyed by pair, interval in minutes and candle start time."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+
+        with self.lock, self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS candles (pair TEXT NOT NULL, interval INTEGER NOT NULL, time INTEGER NOT NULL, "
+                "open REAL, high REAL, low REAL, close REAL, vwap REAL, volume REAL, count INTEGER, "
+                "PRIMARY KEY (pair, interval, time)) WITHOUT ROWID"
+            )
+
+    def last_time(self, pair: str, interval: int) -> int | None:
+        """Returns the start time of the newest stored candle or None if there are no candles."""
+        with self.lock:
+            row = self.connection.execute("SELECT MAX(time) FROM candles WHERE pair = ? AND interval = ?", (pair, interval)).fetchone()
+
+        return row[0]
+
+    def add(self, pair: str, interval: int, candles: list) -> None:
+        """Stores Kraken OHLC rows, a stored candle with the same start time is replaced because it may have been incomplete."""
+        rows = [
+            (pair, interval, int(c[0]), float(c[1]), float(c[2]), float(c[3]), float(c[4]), float(c[5]), float(c[6]), int(c[7]))
+            for c in candles
+        ]
+
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def clear(self, pair: str, interval: int) -> None:
+        """Removes all stored candles of the pair and interval."""
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM candles WHERE pair = ? AND interval = ?", (pair, interval))
+
+    def get(self, pair: str, interval: int, length: int | None = None) -> list:
+        """Returns the newest candles in ascending order as Kraken OHLC rows, all stored candles if no length is given."""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT time, open, high, low, close, vwap, volume, count FROM candles WHERE pair = ? AND interval = ? ORDER BY time DESC LIMIT ?",
+                (pair, interval, -1 if length is None else length),
+            ).fetchall()
+
+        return [list(row) for row in reversed(rows)]
+
+    def update(self, pair: str, interval: int, length: int, fetch: Callable[[float], list]) -> int:
+        """Tops up the candles with all candles since the newest stored one and returns the number of received candles."""
+        last_time = self.last_time(pair, interval)
+        now = time.time()
+
+        # Kraken only serves the newest 720 candles, an older series can not be continued without a gap
+        if last_time is not None and last_time < now - interval * 60 * KRAKEN_MAX_CANDLES:
+            logging.warning(f"Stored {pair} candles with interval {interval} are too old to be continued, reloading them.")
+            self.clear(pair, interval)
+            last_time = None
+
+        # The newest stored candle is requested again, it was probably still open when it was stored
+        since = now - interval * 60 * min(length, KRAKEN_MAX_CANDLES) if last_time is None else last_time - 1
+
+        candles = fetch(since)
+        self.add(pair, interval, candles)
+
+        return len(candles)
+
+
+_stores = {}
+
+
+def get_candle_store() -> CandleStore:
+    """Returns the candle store of the current data directory, it is opened once per process."""
+    path = data_path("candles.sqlite")
+
+    if path not in _stores:
+        _stores[path] = CandleStore(path)
+
+    return _stores[path]
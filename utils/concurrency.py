@@ -0,0 +1,170 @@
+"""Concurrent execution of independent Kraken requests within the API rate limits."""
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+from kraken.exceptions import KrakenApiLimitExceededError, KrakenRateLimitExceededError
+from utils.metrics import measure
+from utils.replay import cassette_key, get_cassette
+
+MAX_WORKERS = int(os.getenv("CB0TMAXWORKERS", "4"))
+
+
+class CallCounter:
+    """Mirror of the Kraken API call counter which blocks callers until the decayed counter has room for the next call."""
+
+    def __init__(self, limit: float, decay: float):
+        self.limit = limit
+        self.decay = decay
+        self.counter = 0.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, cost: float = 1) -> None:
+        """Waits until the call fits into the counter limit and adds its cost to the counter."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.counter = max(0.0, self.counter - (now - self.updated) * self.decay)
+                self.updated = now
+
+                if self.counter + cost <= self.limit:
+                    self.counter += cost
+                    return
+
+                wait = (self.counter + cost - self.limit) / self.decay
+
+            time.sleep(wait)
+
+    def saturate(self) -> None:
+        """Fills the counter to its limit after Kraken rejected a call, the next calls wait for the counter to decay."""
+        with self.lock:
+            self.counter = self.limit
+            self.updated = time.monotonic()
+
+
+class Scheduler:
+    """Gateway for Kraken REST calls which throttles them per endpoint class, coalesces identical calls in flight and retries rate limited calls."""
+
+    def __init__(self, counters: dict[str, CallCounter], retries: int = 3, backoff: float = 1, serialized: tuple[str, ...] = ("private", "trading")):
+        self.counters = counters
+        self.retries = retries
+        self.backoff = backoff
+        self.serialized = serialized
+        self.inflight = {}
+        self.lock = threading.Lock()
+        # The SDK takes the nonce of a signed request from the clock, so signed requests of one API key are sent one at a time
+        # to arrive at Kraken in nonce order
+        self.nonce_lock = threading.Lock()
+        self.stats = defaultdict(Counter)
+
+    def call(self, func: Callable, *args, endpoint: str = "private", cost: float = 1, coalesce: bool = True, **kwargs) -> Any:
+        """Calls a Kraken endpoint of the endpoint class, a call identical to one in flight waits for and shares its result."""
+        cassette = get_cassette()
+
+        # Recorded responses replace the Kraken API for offline tests and benchmarks
+        if cassette is not None:
+            key = cassette_key(f"kraken.{endpoint}", getattr(func, "__qualname__", repr(func)), args, kwargs)
+            return cassette.call(key, lambda: self._call(func, args, kwargs, endpoint, cost))
+
+        if not coalesce:
+            return self._call(func, args, kwargs, endpoint, cost)
+
+        key = (endpoint, getattr(func, "__qualname__", repr(func)), repr(args), repr(sorted(kwargs.items())))
+
+        with self.lock:
+            flight = self.inflight.get(key)
+            leader = flight is None
+
+            if leader:
+                flight = self.inflight[key] = Future()
+
+        if not leader:
+            self.stats[endpoint]["coalesced"] += 1
+            return flight.result()
+
+        try:
+            result = self._call(func, args, kwargs, endpoint, cost)
+            flight.set_result(result)
+            return result
+
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+
+    def _call(self, func: Callable, args: tuple, kwargs: dict, endpoint: str, cost: float) -> Any:
+        """Calls the endpoint once its cost fits into the counter and retries with exponential backoff while Kraken rejects the rate."""
+        counter = self.counters[endpoint]
+
+        for attempt in range(self.retries + 1):
+            with measure(f"kraken.{endpoint}.wait"):
+                counter.acquire(cost)
+
+            self.stats[endpoint]["calls"] += 1
+
+            try:
+                if endpoint in self.serialized:
+                    with self.nonce_lock, measure(f"kraken.{endpoint}"):
+                        return func(*args, **kwargs)
+
+                with measure(f"kraken.{endpoint}"):
+                    return func(*args, **kwargs)
+
+            except (KrakenApiLimitExceededError, KrakenRateLimitExceededError):
+                counter.saturate()
+
+                if attempt == self.retries:
+                    raise
+
+                delay = self.backoff * 2**attempt
+                self.stats[endpoint]["retries"] += 1
+                logging.warning(f"Kraken rate limit exceeded for {getattr(func, '__qualname__', func)}, retrying in {delay:.1f} s")
+                time.sleep(delay)
+
+
+# Kraken starter tier: the counter of private endpoints is limited to 15 and decreases by 0.33 per second, orders have their own
+# counter of 60 which decreases by 1 per second and public endpoints are limited per IP to about one call per second with short bursts
+scheduler = Scheduler(
+    {
+        "public": CallCounter(float(os.getenv("CB0TPUBLICCALLLIMIT", "5")), float(os.getenv("CB0TPUBLICCALLDECAY", "1"))),
+        "private": CallCounter(float(os.getenv("CB0TCALLLIMIT", "15")), float(os.getenv("CB0TCALLDECAY", "0.33"))),
+        "trading": CallCounter(float(os.getenv("CB0TTRADECALLLIMIT", "60")), float(os.getenv("CB0TTRADECALLDECAY", "1"))),
+    },
+    retries=int(os.getenv("CB0TCALLRETRIES", "3")),
+    backoff=float(os.getenv("CB0TCALLBACKOFF", "1")),
+)
+
+
+def public_call(func: Callable, *args, **kwargs) -> Any:
+    """Calls a public Kraken endpoint through the scheduler."""
+    return scheduler.call(func, *args, endpoint="public", **kwargs)
+
+
+def private_call(func: Callable, *args, cost: float = 1, **kwargs) -> Any:
+    """Calls a private Kraken endpoint through the scheduler after its cost fits into the call counter."""
+    return scheduler.call(func, *args, endpoint="private", cost=cost, **kwargs)
+
+
+def trading_call(func: Callable, *args, **kwargs) -> Any:
+    """Calls a Kraken order endpoint through the scheduler, orders are never coalesced."""
+    return scheduler.call(func, *args, endpoint="trading", coalesce=False, **kwargs)
+
+
+def fan_out(calls: dict[Any, Callable[[], Any]], max_workers: int = MAX_WORKERS) -> dict[Any, Any]:
+    """Runs independent calls concurrently with a bounded number of threads and returns their results by key."""
+    if len(calls) <= 1:
+        return {key: call() for key, call in calls.items()}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(calls))) as executor:
+        # Every call runs in a copy of the caller's context, so its measurements count for the caller's invocation
+        futures = {key: executor.submit(contextvars.copy_context().run, call) for key, call in calls.items()}
+        return {key: future.result() for key, future in futures.items()}
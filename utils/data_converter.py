@@ -1,10 +1,28 @@
 """Utility functions for data conversion and processing."""
 
+import numpy as np
 import pandas as pd
 
+OHLC_DTYPES = {
+    "time": np.int64,
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "vwap": np.float64,
+    "volume": np.float64,
+    "count": np.int64,
+}
+
+
+def ohlc_to_arrays(ohlc_data: list) -> dict[str, np.ndarray]:
+    """Parse OHLC rows from Kraken API, where prices are strings, column by column into typed NumPy arrays."""
+    columns = list(zip(*ohlc_data)) or [()] * len(OHLC_DTYPES)
+    return {name: np.array(column, dtype=dtype) for (name, dtype), column in zip(OHLC_DTYPES.items(), columns)}
+
 
 def ohlc_to_dataframe(ohlc_data: list) -> pd.DataFrame:
     """Convert OHLC data from Kraken API to a pandas DataFrame with datetime index."""
-    df = pd.DataFrame(ohlc_data, columns=["time", "open", "high", "low", "close", "vwap", "volume", "count"])
-    df["time"] = pd.to_datetime(df["time"], unit="s")
-    return df
+    arrays = ohlc_to_arrays(ohlc_data)
+    arrays["time"] = pd.to_datetime(arrays["time"], unit="s")
+    return pd.DataFrame(arrays)
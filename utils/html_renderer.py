@@ -2,18 +2,126 @@
 
 import os
 import json
+import hashlib
+import threading
+from collections import OrderedDict
 import azure.functions as func
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import BytecodeCache, Environment, FileSystemLoader, meta
+from jinja2.bccache import Bucket
+from utils.metrics import measure
+from utils.storage import data_path
 
 template_dir = os.path.join(os.path.dirname(__file__), "../html/")
-jinja_env = Environment(loader=FileSystemLoader(template_dir))
 
 
-def html(template: str, *args, **kwargs) -> func.HttpResponse:
-    """Renders the HTML template with the current environment and schedule."""
+class TemplateBytecodeCache(BytecodeCache):
+    """Compiled templates in the templates folder of the data directory, the folder is created when the first template is compiled."""
+
+    def load_bytecode(self, bucket: Bucket) -> None:
+        """Loads the compiled template of the bucket if it was stored before."""
+        path = data_path(os.path.join("templates", f"{bucket.key}.cache"))
+
+        if os.path.exists(path):
+            with open(path, "rb") as file:
+                bucket.load_bytecode(file)
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        """Stores the compiled template of the bucket."""
+        path = data_path(os.path.join("templates", f"{bucket.key}.cache"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # The file is replaced atomically, a concurrent cold start never reads a partly written template
+        with open(f"{path}.tmp", "wb") as file:
+            bucket.write_bytecode(file)
+
+        os.replace(f"{path}.tmp", path)
+
+
+# Compiled templates are kept on disk across cold starts, in production the templates are never checked for changes
+jinja_env = Environment(
+    loader=FileSystemLoader(template_dir),
+    bytecode_cache=TemplateBytecodeCache(),
+    auto_reload=os.getenv("CB0TENV", "DEV") != "PROD",
+)
+
+# Templates referenced by a template with the modification time they were parsed at
+template_references = {}
+template_references_lock = threading.Lock()
+
+# Rendered pages by ETag, the ETag is derived from the template and all render inputs
+rendered_pages = OrderedDict()
+rendered_pages_lock = threading.Lock()
+MAX_RENDERED_PAGES = int(os.getenv("CB0TPAGECACHESIZE", "32"))
+
+
+def template_mtimes(template: str) -> dict[str, float]:
+    """Returns the modification times of the template and of all templates it extends, includes or imports."""
+    mtimes = {}
+    pending = [template]
+
+    while pending:
+        name = pending.pop()
+        mtime = os.path.getmtime(os.path.join(template_dir, name))
+        mtimes[name] = mtime
+
+        with template_references_lock:
+            cached = template_references.get(name)
+
+        if cached is None or cached[0] != mtime:
+            source, _, _ = jinja_env.loader.get_source(jinja_env, name)
+            # Dynamic references are None, they cannot be followed
+            cached = (mtime, {reference for reference in meta.find_referenced_templates(jinja_env.parse(source)) if reference})
+
+            with template_references_lock:
+                template_references[name] = cached
+
+        pending += [reference for reference in cached[1] if reference not in mtimes]
+
+    return mtimes
+
+
+def html(template: str, *args, request: func.HttpRequest | None = None, max_age: int = 0, **kwargs) -> func.HttpResponse:
+    """Renders the HTML template with the current environment and schedule.
+
+    Pages are cached by an ETag of the render inputs, a request whose If-None-Match header contains the ETag is answered with 304.
+    Browsers revalidate the page on every request unless max_age allows them to reuse it for some seconds.
+    """
     template_obj = jinja_env.get_template(template)
     kwargs["env"] = os.getenv("CB0TENV", "DEV")
-    return func.HttpResponse(template_obj.render(*args, **kwargs), mimetype="text/html", status_code=200)
+
+    # The render inputs of the routes are JSON data and rendered HTML, their canonical JSON identifies the page
+    try:
+        inputs = json.dumps([template, template_mtimes(template), args, kwargs], sort_keys=True, default=str)
+        etag = '"' + hashlib.sha256(inputs.encode()).hexdigest()[:32] + '"'
+
+    except (TypeError, ValueError):
+        etag = None
+
+    with rendered_pages_lock:
+        body = rendered_pages.get(etag)
+
+        if body is not None:
+            rendered_pages.move_to_end(etag)
+
+    if body is None:
+        with measure("html.render"):
+            body = template_obj.render(*args, **kwargs).encode()
+
+        if etag is None:
+            etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+        with rendered_pages_lock:
+            rendered_pages[etag] = body
+
+            while len(rendered_pages) > MAX_RENDERED_PAGES:
+                rendered_pages.popitem(last=False)
+
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={max_age}" if max_age else "no-cache"}
+
+    if request is not None and etag in [tag.strip().removeprefix("W/") for tag in request.headers.get("If-None-Match", "").split(",")]:
+        return func.HttpResponse(status_code=304, headers=headers)
+
+    return func.HttpResponse(body, mimetype="text/html", status_code=200, headers=headers)
 
 
 def print_json(obj: dict) -> None:
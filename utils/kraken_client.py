@@ -1,6 +1,69 @@
-"""Kraken API client configuration."""
+"""Kraken API client configuration, the clients are created on first use and shared to reuse their connections."""
 import os
-from kraken.spot import User, Trade
+import threading
+from typing import Any
+import requests
+from kraken.spot import Market, User, Trade
 
-user = User(key=os.getenv("KRAKENAPIKEY"), secret=os.getenv("KRAKENAPISECRET"))
-trade = Trade(key=os.getenv("KRAKENAPIKEY"), secret=os.getenv("KRAKENAPISECRET"))
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(cls: type) -> Any:
+    """Returns the shared client of the Kraken client class, it is created with the API key of the environment on first use."""
+    with _clients_lock:
+        if cls not in _clients:
+            client = cls(key=os.getenv("KRAKENAPIKEY") or "", secret=os.getenv("KRAKENAPISECRET") or "")
+
+            # The SDK replaces its session every 5 minutes by default, a longer lifetime keeps the connections alive between calls
+            client.MAX_SESSION_AGE = int(os.getenv("CB0TSESSIONAGE", "3600"))
+            _clients[cls] = client
+
+        return _clients[cls]
+
+
+def market() -> Market:
+    """Returns the shared public market data client."""
+    return get_client(Market)
+
+
+class LazyClient:
+    """Placeholder of a shared client which creates the client when one of its attributes is used the first time."""
+
+    def __init__(self, cls: type):
+        self.cls = cls
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_client(self.cls), name)
+
+
+user = LazyClient(User)
+trade = LazyClient(Trade)
+
+
+def _session(client: Any) -> requests.Session | None:
+    """Returns the current requests session of a client, found by its type because the SDK replaces it after MAX_SESSION_AGE."""
+    return next((value for value in vars(client).values() if isinstance(value, requests.Session)), None)
+
+
+def connection_stats() -> dict[str, dict]:
+    """Returns the requests and opened connections of the created clients since their current session was started."""
+    stats = {}
+
+    with _clients_lock:
+        clients = dict(_clients)
+
+    for cls, client in clients.items():
+        session = _session(client)
+
+        # Without a recognizable session the client is left out instead of failing the metrics
+        if session is None:
+            continue
+
+        pools = [adapter.poolmanager.pools[key] for adapter in session.adapters.values() for key in adapter.poolmanager.pools.keys()]
+        requests_sent = sum(pool.num_requests for pool in pools)
+        connections = sum(pool.num_connections for pool in pools)
+
+        stats[cls.__name__] = {"requests": requests_sent, "connections": connections, "reused": requests_sent - connections}
+
+    return stats
@@ -0,0 +1,154 @@
+"""Process wide cache for Kraken market data shared by all assets and routes."""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+from utils.concurrency import public_call
+from utils.kraken_client import market
+from utils.metrics import register_cache
+from utils.price_feed import get_price_feed
+
+
+class TTLCache:
+    """Thread safe cache where every entry expires after a time to live and the least recently used entries are evicted."""
+
+    def __init__(self, ttl: float, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Returns the cached value of the key or the default if it is missing or expired."""
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None or entry[0] < time.monotonic():
+                self.entries.pop(key, None)
+                self.misses += 1
+                return default
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Any, value: Any) -> None:
+        """Stores the value and evicts the least recently used entries if the cache is full."""
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def get_or_load(self, key: Any, loader: Callable[[], Any]) -> Any:
+        """Returns the cached value of the key or loads, stores and returns it."""
+        missing = object()
+        value = self.get(key, missing)
+
+        if value is missing:
+            value = loader()
+            self.set(key, value)
+
+        return value
+
+    def clear(self) -> None:
+        """Removes all entries from the cache."""
+        with self.lock:
+            self.entries.clear()
+
+
+ticker_cache = TTLCache(float(os.getenv("CB0TTICKERTTL", "10")), int(os.getenv("CB0TCACHESIZE", "256")))
+ohlc_cache = TTLCache(float(os.getenv("CB0TOHLCTTL", "300")), int(os.getenv("CB0TCACHESIZE", "256")))
+asset_pairs_cache = TTLCache(float(os.getenv("CB0TASSETPAIRSTTL", "3600")), int(os.getenv("CB0TCACHESIZE", "256")))
+pair_metadata_cache = TTLCache(float(os.getenv("CB0TPAIRMETADATATTL", "86400")), int(os.getenv("CB0TCACHESIZE", "256")))
+
+for name, cache in (("ticker", ticker_cache), ("ohlc", ohlc_cache), ("asset_pairs", asset_pairs_cache), ("pair_metadata", pair_metadata_cache)):
+    register_cache(name, cache)
+
+
+def get_ticker(pair: str) -> dict:
+    """Returns the Kraken ticker of the pair, served from the price feed or the cache while they are fresh."""
+    feed = get_price_feed()
+    streamed = feed.get_ticker(pair) if feed else None
+
+    if streamed is not None:
+        return streamed
+
+    return ticker_cache.get_or_load(pair, lambda: public_call(market().get_ticker, pair))
+
+
+def get_tickers(pairs: list[str]) -> dict:
+    """Returns the Kraken tickers of several pairs, all pairs missing in the price feed and the cache are fetched with a single request."""
+    feed = get_price_feed()
+    tickers = {}
+    missing = []
+
+    for pair in pairs:
+        ticker = (feed.get_ticker(pair) if feed else None) or ticker_cache.get(pair)
+
+        if ticker is None:
+            missing.append(pair)
+        else:
+            tickers.update(ticker)
+
+    if missing:
+        fetched = public_call(market().get_ticker, missing)
+
+        # Kraken answers with the canonical pair names, a single alternative name like BTCEUR can be mapped directly
+        if len(missing) == 1 and len(fetched) == 1 and missing[0] not in fetched:
+            ticker_cache.set(missing[0], fetched)
+
+        for pair, values in fetched.items():
+            ticker_cache.set(pair, {pair: values})
+
+        tickers.update(fetched)
+
+    return tickers
+
+
+def get_ohlc(pair: str, interval: int, since: float | None = None) -> dict:
+    """Returns the Kraken OHLC data of the pair, requests starting within the same candle share one cache entry."""
+    bucket = None if since is None else int(since // (interval * 60))
+    return ohlc_cache.get_or_load((pair, interval, bucket), lambda: public_call(market().get_ohlc, pair, interval, since=since))
+
+
+def get_asset_pairs(pair: str) -> dict:
+    """Returns the Kraken asset pair details of the pair, served from the cache while they are fresh."""
+    return asset_pairs_cache.get_or_load(pair, lambda: public_call(market().get_asset_pairs, pair))
+
+
+def get_pair_metadata(pairs: list[str]) -> dict[str, dict]:
+    """Returns the order limits of several pairs by pair, all pairs missing in the registry are fetched with a single request."""
+    metadata = {pair: pair_metadata_cache.get(pair) for pair in pairs}
+    missing = [pair for pair, limits in metadata.items() if limits is None]
+
+    if missing:
+        fetched = public_call(market().get_asset_pairs, missing)
+
+        for pair in missing:
+            # Kraken answers with the canonical pair names, alternative names like BTCEUR are found by their altname
+            details = fetched.get(pair) or next((d for d in fetched.values() if pair in (d.get("altname"), d.get("wsname"))), None)
+
+            if details is None:
+                raise KeyError(f"No asset pair details received for {pair}")
+
+            metadata[pair] = {
+                "ordermin": float(details["ordermin"]),
+                "lot_decimals": int(details["lot_decimals"]),
+                "pair_decimals": int(details["pair_decimals"]),
+                "tick_size": float(details.get("tick_size") or 10 ** -int(details["pair_decimals"])),
+            }
+            pair_metadata_cache.set(pair, metadata[pair])
+
+    return metadata
+
+
+def clear_caches() -> None:
+    """Removes all cached market data."""
+    for cache in (ticker_cache, ohlc_cache, asset_pairs_cache, pair_metadata_cache):
+        cache.clear()
@@ -0,0 +1,129 @@
+"""Call counts and latencies of the hot paths, summarized per invocation and exported in the Prometheus text format."""
+
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+# Totals per measured name since the start of the process
+stats = defaultdict(lambda: {"count": 0, "errors": 0, "seconds": 0.0, "max": 0.0})
+stats_lock = threading.Lock()
+
+# Caches with hits and misses counters whose hit rates are reported, registered by the modules which own them
+caches = {}
+
+# Calls of the current invocation by name, threads started with fan_out share the invocation of their caller
+_invocation_calls: ContextVar[dict | None] = ContextVar("invocation_calls", default=None)
+
+
+def register_cache(name: str, cache: Any) -> None:
+    """Reports the hit rate of a cache with hits and misses counters."""
+    caches[name] = cache
+
+
+def record(name: str, seconds: float, error: bool = False) -> None:
+    """Adds a call with its duration to the totals and to the current invocation."""
+    with stats_lock:
+        total = stats[name]
+        total["count"] += 1
+        total["errors"] += int(error)
+        total["seconds"] += seconds
+        total["max"] = max(total["max"], seconds)
+
+        calls = _invocation_calls.get()
+
+        if calls is not None:
+            count, duration = calls.get(name, (0, 0.0))
+            calls[name] = (count + 1, duration + seconds)
+
+
+@contextmanager
+def measure(name: str):
+    """Measures the duration of a block, also usable as decorator of a function."""
+    start = time.perf_counter()
+    error = False
+
+    try:
+        yield
+
+    except BaseException:
+        error = True
+        raise
+
+    finally:
+        record(name, time.perf_counter() - start, error)
+
+
+def _cache_counts() -> dict[str, tuple[int, int]]:
+    """Returns the hits and misses of every registered cache."""
+    return {name: (cache.hits, cache.misses) for name, cache in caches.items()}
+
+
+@contextmanager
+def invocation(name: str):
+    """Measures a function invocation and logs one structured line with its calls, latencies and cache hit rates."""
+    calls = {}
+    token = _invocation_calls.set(calls)
+    before = _cache_counts()
+    start = time.perf_counter()
+    error = False
+
+    try:
+        yield
+
+    except BaseException:
+        error = True
+        raise
+
+    finally:
+        seconds = time.perf_counter() - start
+        _invocation_calls.reset(token)
+        record(name, seconds, error)
+
+        hit_rates = {}
+        for cache, (hits, misses) in _cache_counts().items():
+            hits, misses = hits - before.get(cache, (0, 0))[0], misses - before.get(cache, (0, 0))[1]
+
+            if hits + misses:
+                hit_rates[cache] = round(hits / (hits + misses), 3)
+
+        summary = {
+            "invocation": name,
+            "status": "error" if error else "ok",
+            "ms": round(seconds * 1000, 1),
+            "calls": {call: {"count": count, "ms": round(duration * 1000, 1)} for call, (count, duration) in sorted(calls.items())},
+            "cache_hit_rate": hit_rates,
+        }
+        logging.info(json.dumps(summary))
+
+
+def prometheus() -> str:
+    """Returns the totals and the cache counters in the Prometheus text exposition format."""
+    with stats_lock:
+        totals = {name: dict(total) for name, total in sorted(stats.items())}
+
+    lines = [
+        "# HELP cb0t_call_seconds Duration of measured calls.",
+        "# TYPE cb0t_call_seconds summary",
+    ]
+    for name, total in totals.items():
+        lines.append(f'cb0t_call_seconds_sum{{name="{name}"}} {total["seconds"]:.6f}')
+        lines.append(f'cb0t_call_seconds_count{{name="{name}"}} {total["count"]}')
+
+    lines += ["# HELP cb0t_call_seconds_max Longest measured call.", "# TYPE cb0t_call_seconds_max gauge"]
+    lines += [f'cb0t_call_seconds_max{{name="{name}"}} {total["max"]:.6f}' for name, total in totals.items()]
+
+    lines += ["# HELP cb0t_call_errors_total Measured calls which raised an exception.", "# TYPE cb0t_call_errors_total counter"]
+    lines += [f'cb0t_call_errors_total{{name="{name}"}} {total["errors"]}' for name, total in totals.items()]
+
+    counts = _cache_counts()
+    lines += ["# HELP cb0t_cache_hits_total Cache lookups served from the cache.", "# TYPE cb0t_cache_hits_total counter"]
+    lines += [f'cb0t_cache_hits_total{{cache="{name}"}} {hits}' for name, (hits, _) in counts.items()]
+    lines += ["# HELP cb0t_cache_misses_total Cache lookups which had to load the value.", "# TYPE cb0t_cache_misses_total counter"]
+    lines += [f'cb0t_cache_misses_total{{cache="{name}"}} {misses}' for name, (_, misses) in counts.items()]
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,123 @@
+"""Optional streaming price feed which keeps the latest tickers of subscribed pairs in memory."""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from kraken.spot import SpotWSClient
+
+# Symbols of the Kraken WebSocket API v2 for the REST pair names of the assets
+SYMBOLS = {
+    "XXBTZUSD": "BTC/USD",
+    "XBTUSDC": "BTC/USDC",
+    "XXBTZEUR": "BTC/EUR",
+    "XETHZUSD": "ETH/USD",
+    "XETHZEUR": "ETH/EUR",
+    "SOLUSD": "SOL/USD",
+    "SOLEUR": "SOL/EUR",
+    "PAXGEUR": "PAXG/EUR",
+}
+
+
+class PriceFeed:
+    """Book of the latest tickers of several pairs, maintained by a WebSocket connection in a background thread."""
+
+    def __init__(self, pairs: list[str], ws_url: str | None = None, max_age: float = 30):
+        self.pairs = {SYMBOLS[pair]: pair for pair in pairs if pair in SYMBOLS}
+        self.ws_url = ws_url
+        self.max_age = max_age
+        self.tickers = {}
+        self.lock = threading.Lock()
+        self.subscribed = threading.Event()
+        self.loop = None
+        self.stopping = None
+        self.thread = None
+
+    def start(self) -> "PriceFeed":
+        """Starts the connection in a daemon thread and returns the feed."""
+        self.thread = threading.Thread(target=asyncio.run, args=(self._run(),), name="price-feed", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout: float = 15) -> None:
+        """Closes the connection and waits for the background thread."""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.stopping.set)
+
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    async def _run(self) -> None:
+        """Connects, subscribes to the ticker channel of all pairs and runs until the feed is stopped."""
+        self.stopping = asyncio.Event()
+        self.loop = asyncio.get_running_loop()
+        client = SpotWSClient(callback=self._on_message, ws_url=self.ws_url)
+
+        try:
+            await client.start()
+            await client.subscribe({"channel": "ticker", "symbol": list(self.pairs)})
+
+            self.subscribed.set()
+            logging.info(f"Price feed subscribed to {', '.join(self.pairs)}")
+            await self.stopping.wait()
+
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logging.error(f"Price feed failed: {str(e).replace(chr(10), ' ')}")
+
+        finally:
+            await client.close()
+
+    async def _on_message(self, message: dict) -> None:
+        """Updates the book with the ticker messages of the subscribed pairs."""
+        if not isinstance(message, dict) or message.get("channel") != "ticker":
+            return
+
+        received = time.monotonic()
+
+        with self.lock:
+            for data in message.get("data", []):
+                pair = self.pairs.get(data.get("symbol"))
+
+                if pair is not None:
+                    self.tickers[pair] = (received, data)
+
+    def get_ticker(self, pair: str) -> dict | None:
+        """Returns the streamed ticker of the pair in the format of the Kraken REST ticker, None if it is missing or outdated."""
+        with self.lock:
+            received, data = self.tickers.get(pair, (None, None))
+
+        if received is None or time.monotonic() - received > self.max_age:
+            return None
+
+        return {
+            pair: {
+                "a": [str(data["ask"]), str(data["ask_qty"])],
+                "b": [str(data["bid"]), str(data["bid_qty"])],
+                "c": [str(data["last"]), "0"],
+                "v": [str(data["volume"]), str(data["volume"])],
+                "p": [str(data["vwap"]), str(data["vwap"])],
+                "l": [str(data["low"]), str(data["low"])],
+                "h": [str(data["high"]), str(data["high"])],
+            }
+        }
+
+
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+
+def get_price_feed() -> PriceFeed | None:
+    """Returns the price feed of the pairs in CB0TPRICEFEED which is started on first use, None if streaming is disabled."""
+    pairs = os.getenv("CB0TPRICEFEED")
+
+    if not pairs:
+        return None
+
+    key = (pairs, os.getenv("CB0TWSURL"))
+
+    with _feeds_lock:
+        if key not in _feeds:
+            _feeds[key] = PriceFeed(pairs.split(","), key[1], max_age=float(os.getenv("CB0TPRICEFEEDMAXAGE", "30"))).start()
+
+    return _feeds[key]
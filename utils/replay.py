@@ -0,0 +1,70 @@
+"""Recording and replay of Kraken and Yahoo Finance responses for offline tests and reproducible benchmarks."""
+
+import json
+import os
+import threading
+from typing import Any, Callable
+
+# Parameters which depend on the current time, they are left out of the keys so a recording can be replayed later
+VOLATILE_PARAMETERS = ("since", "start")
+
+
+def cassette_key(source: str, name: str, args: tuple = (), kwargs: dict | None = None) -> str:
+    """Returns the key of a call in the cassette."""
+    kwargs = {key: value for key, value in (kwargs or {}).items() if key not in VOLATILE_PARAMETERS}
+    return f"{source} {name} {json.dumps(list(args), default=str)} {json.dumps(kwargs, sort_keys=True, default=str)}"
+
+
+class Cassette:
+    """JSON file of recorded responses by call key, in record mode the calls are executed and their responses are stored."""
+
+    def __init__(self, path: str, mode: str = "replay"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode {mode}, use record or replay")
+
+        self.path = path
+        self.mode = mode
+        self.lock = threading.Lock()
+        self.responses = {}
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self.responses = json.load(file)
+
+    def call(self, key: str, func: Callable[[], Any]) -> Any:
+        """Returns the recorded response of the key, in record mode the function is called and its response is recorded first."""
+        if self.mode == "replay":
+            if key not in self.responses:
+                raise KeyError(f"No recorded response for {key} in {self.path}")
+
+            return self.responses[key]
+
+        response = func()
+
+        with self.lock:
+            self.responses[key] = response
+
+            with open(self.path, "w", encoding="utf-8") as file:
+                json.dump(self.responses, file, indent=1, sort_keys=True)
+
+        return response
+
+
+_cassettes = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette() -> Cassette | None:
+    """Returns the cassette of the file in CB0TCASSETTE in the mode of CB0TCASSETTEMODE (replay by default), None if no cassette is used."""
+    path = os.getenv("CB0TCASSETTE")
+
+    if not path:
+        return None
+
+    key = (path, os.getenv("CB0TCASSETTEMODE", "replay"))
+
+    with _cassettes_lock:
+        if key not in _cassettes:
+            _cassettes[key] = Cassette(*key)
+
+    return _cassettes[key]
@@ -0,0 +1,76 @@
+"""Cache of computed results which are valid for one version of their input data."""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+
+class ResultCache:
+    """Keyed cache of computed results, outdated results can be served while they are recomputed in the background.
+
+    With max_entries the least recently used results are evicted once the cache is full.
+    """
+
+    def __init__(self, stale_while_revalidate: bool = True, max_entries: int | None = None):
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.refreshing = set()
+        self.lock = threading.Lock()
+
+    def get(self, key: Any, version: Any, compute: Callable[[], tuple[Any, Any]], revalidate: bool = False) -> Any:
+        """Returns the result of the key for the data version.
+
+        compute returns the data version it used together with the result. A stored result of another version,
+        or any stored result if revalidate is set, is outdated. In stale-while-revalidate mode an outdated result
+        is served while it is recomputed in a background thread, otherwise and without a stored result it is computed synchronously.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is not None:
+                self.entries.move_to_end(key)
+
+        if entry is not None and entry[0] == version and not revalidate:
+            return entry[1]
+
+        if entry is not None and self.stale_while_revalidate:
+            with self.lock:
+                if key in self.refreshing:
+                    return entry[1]
+
+                self.refreshing.add(key)
+
+            threading.Thread(target=self._refresh, args=(key, compute), daemon=True).start()
+            return entry[1]
+
+        return self._store(key, *compute())
+
+    def _refresh(self, key: Any, compute: Callable[[], tuple[Any, Any]]) -> None:
+        """Recomputes the result of the key in the background."""
+        try:
+            self._store(key, *compute())
+
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logging.error(f"Recomputing the result of {key} failed: {str(e).replace(chr(10), ' ')}")
+
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def _store(self, key: Any, version: Any, result: Any) -> Any:
+        """Stores the result of the key for the data version and returns it."""
+        with self.lock:
+            self.entries[key] = (version, result)
+            self.entries.move_to_end(key)
+
+            while self.max_entries is not None and len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+        return result
+
+    def clear(self) -> None:
+        """Removes all stored results."""
+        with self.lock:
+            self.entries.clear()
@@ -0,0 +1,12 @@
+"""Local storage location for persistent caches and ledgers."""
+
+import os
+import tempfile
+
+
+def data_path(filename: str) -> str:
+    """Returns the path of a file in the local data directory and creates the directory if necessary."""
+    # Azure Functions only allows writing to the temp directory, CB0TDATA can point elsewhere for local runs
+    directory = os.getenv("CB0TDATA", os.path.join(tempfile.gettempdir(), "cb0t"))
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, filename)